@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # local apps
     "main.apps.MainConfig",
     # third party apps
@@ -84,6 +85,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "core.wsgi.application"
 
+# serve /api/project/ and /api/task/ with the async views, enable this when
+# running core.asgi:application under an ASGI server (uvicorn, daphne, ...)
+ASYNC_API_VIEWS = config("ASYNC_API_VIEWS", default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -96,9 +101,63 @@ DATABASES = {
         "PASSWORD": config("DATABASE_PASSWORD"),
         "HOST": config("DATABASE_HOST"),
         "PORT": config("DATABASE_PORT"),
+        # seconds a connection is kept open and reused across requests, 0 closes
+        # it after every request, None keeps it forever. Under ASGI each request
+        # runs in its own thread, so persistent connections are not reused there.
+        "CONN_MAX_AGE": config(
+            "DATABASE_CONN_MAX_AGE",
+            default="60",
+            cast=lambda value: None if value.lower() == "none" else int(value),
+        ),
+        # ping a reused connection before the first query of each request, so a
+        # connection dropped by the server (restart, idle timeout) is replaced
+        "CONN_HEALTH_CHECKS": config(
+            "DATABASE_CONN_HEALTH_CHECKS", default=True, cast=bool
+        ),
+        # set to True behind PgBouncer in transaction pooling mode, named
+        # cursors (used by QuerySet.iterator()) do not survive across transactions
+        "DISABLE_SERVER_SIDE_CURSORS": config(
+            "DATABASE_DISABLE_SERVER_SIDE_CURSORS", default=False, cast=bool
+        ),
+        "OPTIONS": {
+            "connect_timeout": config("DATABASE_CONNECT_TIMEOUT", default=10, cast=int),
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# local memory is per process; point CACHE_BACKEND at a shared backend such as
+# django.core.cache.backends.redis.RedisCache when running several workers
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="tms"),
     }
 }
 
+# seconds a cached project / task list page is served for
+LIST_CACHE_TIMEOUT = config("LIST_CACHE_TIMEOUT", default=60, cast=int)
+
+
+# Background jobs
+# main/jobs.py, run by `python manage.py runworker`
+
+# runs of a failing job before it is marked FAILED
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", default=5, cast=int)
+# seconds before the first retry, doubled after every further failure
+JOB_RETRY_DELAY = config("JOB_RETRY_DELAY", default=10, cast=int)
+# seconds a RUNNING job may go without reporting progress before it is
+# considered lost (its worker died) and queued again
+JOB_LOCK_TIMEOUT = config("JOB_LOCK_TIMEOUT", default=600, cast=int)
+
+# hours before its due date a task gets a DUE_SOON reminder (scan_due_tasks)
+REMINDER_DUE_SOON_HOURS = config("REMINDER_DUE_SOON_HOURS", default=24, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -119,6 +178,27 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+# the first hasher hashes new passwords; stored hashes made by any other listed
+# hasher still verify and are re-hashed with the first one on the next login.
+# Argon2 needs `pip install argon2-cffi`, bcrypt needs `pip install bcrypt`.
+
+PASSWORD_HASHERS = config(
+    "PASSWORD_HASHERS",
+    cast=Csv(),
+    default=",".join(
+        [
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+            "django.contrib.auth.hashers.Argon2PasswordHasher",
+            "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+            "django.contrib.auth.hashers.ScryptPasswordHasher",
+        ]
+    ),
+)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -148,7 +228,11 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "main.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 
@@ -174,8 +258,13 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_EXP_CLAIM": "refresh_exp",
     "SLIDING_TOKEN_LIFETIME": timedelta(days=1),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
+    "TOKEN_USER_CLASS": "main.authentication.ProjectTokenUser",
 }
 
+# seconds / entries of the in-process cache behind ProjectTokenUser.get_user()
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", default=30, cast=int)
+AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=1024, cast=int)
+
 
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
@@ -0,0 +1,362 @@
+import asyncio
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from main.cache import bump_list_version, cache_list_response
+from main.conditional import get_not_modified_response
+from main.filters import ProjectFilter, TaskFilter
+from main.models import Project
+from main.models import Task as ProjectTask
+from main.lists import (
+    PROJECT_UPDATED_FIELDS,
+    TASK_UPDATED_FIELDS,
+    aget_list_etag,
+    apaginate_rows,
+    get_invalid_cursor_response,
+    get_list_paginator,
+    get_list_response,
+    get_list_rows,
+    parse_list_request,
+)
+from main.pagination import InvalidCursor
+from main.purge import delete_project
+from main.serializer import (
+    LeanProjectSerializer,
+    LeanTaskSerializer,
+    ProjectModelSerializer,
+    TaskModelSerializer,
+)
+from main.views import ProjectApiView, ProjectTaskApiView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView WHOSE HANDLERS ARE COROUTINES
+
+    Served from core/asgi.py, a slow query only suspends the request instead
+    of pinning a worker. Authentication, permissions and parsing run on the
+    event loop, so the authentication classes must not touch the database
+    (JWTStatelessUserAuthentication only reads the token claims).
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # APIView wraps the view in csrf_exempt, keep it marked as async
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            # options() and http_method_not_allowed() are the sync APIView ones
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def get_not_found_response(resource):
+    data = {
+        "error": True,
+        "code": "40004",
+        "message": f"{resource} not found",
+    }
+
+    return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncProjectApiView(AsyncAPIView, ProjectApiView):
+    """
+    ASYNC PROJECT API VIEW
+    same requests and responses as ProjectApiView
+    """
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        create_project_payload = {
+            "user": await request.user.aget_user(),
+            "name": serializer.validated_data.get("name"),
+            "description": serializer.validated_data.get("description"),
+        }
+
+        project = await Project.objects.acreate(**create_project_payload)
+
+        data = {
+            "error": False,
+            "code": "201",
+            "project": ProjectModelSerializer(project).data,
+        }
+
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @cache_list_response("project")
+    async def get(self, request):
+        list_filter, lean_serializer, error_response = parse_list_request(
+            request, ProjectFilter, LeanProjectSerializer
+        )
+        if error_response is not None:
+            return error_response
+
+        project_qs = list_filter.qs
+
+        # answer If-None-Match before serializing anything
+        etag = await aget_list_etag(
+            request, project_qs, updated_fields=PROJECT_UPDATED_FIELDS
+        )
+
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        rows = get_list_rows(request, Project, project_qs, lean_serializer)
+
+        paginator = get_list_paginator(request)
+        try:
+            result_page = await apaginate_rows(paginator, rows, request)
+        except InvalidCursor:
+            return get_invalid_cursor_response()
+
+        return get_list_response(paginator, lean_serializer, result_page, etag)
+
+    async def put(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            project = await Project.objects.not_deleted().with_related().aget(
+                id=request.GET.get("project_id")
+            )
+        except Project.DoesNotExist:
+            return get_not_found_response("Project")
+
+        project.name = serializer.validated_data.get("name")
+        project.description = serializer.validated_data.get("description")
+        await project.asave(update_fields=["name", "description", "updated_at"])
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Project updated successfully",
+            "project": ProjectModelSerializer(project).data,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    async def patch(self, request):
+        try:
+            project = await Project.objects.not_deleted().with_related().aget(
+                id=request.GET.get("project_id")
+            )
+        except Project.DoesNotExist:
+            return get_not_found_response("Project")
+
+        project.name = request.data.get("name", project.name)
+        project.description = request.data.get("description", project.description)
+        project.is_active = request.data.get("is_active", project.is_active)
+        await project.asave(
+            update_fields=["name", "description", "is_active", "updated_at"]
+        )
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Project updated successfully",
+            "project": ProjectModelSerializer(project).data,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    async def delete(self, request):
+        try:
+            project = await Project.objects.not_deleted().with_related().aget(
+                id=request.GET.get("project_id")
+            )
+        except Project.DoesNotExist:
+            return get_not_found_response("Project")
+
+        job = await sync_to_async(delete_project)(project)
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Project deleted successfully",
+            "job_id": job.id,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class AsyncProjectTaskApiView(AsyncAPIView, ProjectTaskApiView):
+    """
+    ASYNC TASK API VIEW
+    same requests and responses as ProjectTaskApiView
+    """
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            # the serializer nests project.user, load it in the same query
+            project = await Project.objects.not_deleted().with_related().aget(
+                id=serializer.validated_data.get("project_id")
+            )
+        except Project.DoesNotExist:
+            return get_not_found_response("Project")
+
+        create_task_payload = {
+            "project": project,
+            "title": serializer.validated_data.get("title"),
+            "description": serializer.validated_data.get("description"),
+            "due_date": serializer.validated_data.get("due_date"),
+            "priority_level": serializer.validated_data.get("priority_level"),
+            "status": serializer.validated_data.get("status"),
+        }
+
+        task = await ProjectTask.objects.acreate(**create_task_payload)
+
+        data = {
+            "error": False,
+            "code": "201",
+            "task": TaskModelSerializer(task).data,
+        }
+
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @cache_list_response("task")
+    async def get(self, request):
+        list_filter, lean_serializer, error_response = parse_list_request(
+            request, TaskFilter, LeanTaskSerializer
+        )
+        if error_response is not None:
+            return error_response
+
+        task_qs = list_filter.qs
+
+        # answer If-None-Match before serializing anything
+        etag = await aget_list_etag(
+            request, task_qs, updated_fields=TASK_UPDATED_FIELDS
+        )
+
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        rows = get_list_rows(request, ProjectTask, task_qs, lean_serializer)
+
+        paginator = get_list_paginator(request)
+        try:
+            result_page = await apaginate_rows(paginator, rows, request)
+        except InvalidCursor:
+            return get_invalid_cursor_response()
+
+        return get_list_response(paginator, lean_serializer, result_page, etag)
+
+    async def put(self, request):
+        try:
+            task = await ProjectTask.objects.not_deleted().with_related().aget(
+                id=request.GET.get("task_id")
+            )
+        except ProjectTask.DoesNotExist:
+            return get_not_found_response("Task")
+
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        update_payload = {
+            "title": serializer.validated_data.get("title"),
+            "description": serializer.validated_data.get("description"),
+            "due_date": serializer.validated_data.get("due_date"),
+            "priority_level": serializer.validated_data.get("priority_level"),
+            "status": serializer.validated_data.get("status"),
+        }
+
+        await sync_to_async(task.save_changes)(**update_payload)
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Task updated successfully",
+            "task": TaskModelSerializer(task).data,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    async def patch(self, request):
+        try:
+            task = await ProjectTask.objects.not_deleted().with_related().aget(
+                id=request.GET.get("task_id")
+            )
+        except ProjectTask.DoesNotExist:
+            return get_not_found_response("Task")
+
+        update_payload = {
+            field: request.data[field]
+            for field in ProjectTask.EDITABLE_FIELDS
+            if field in request.data
+        }
+
+        try:
+            await sync_to_async(task.save_changes)(**update_payload)
+        except DjangoValidationError as e:
+            data = {
+                "error": True,
+                "code": "40005",
+                "message": "Validation failed",
+                "errors": e.messages,
+            }
+
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Task updated successfully",
+            "task": TaskModelSerializer(task).data,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    async def delete(self, request):
+        try:
+            task = await ProjectTask.objects.not_deleted().with_related().aget(
+                id=request.GET.get("task_id")
+            )
+        except ProjectTask.DoesNotExist:
+            return get_not_found_response("Task")
+
+        await task.adelete()
+        await sync_to_async(bump_list_version)(task.project.user_id)
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Task deleted successfully",
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
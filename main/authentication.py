@@ -0,0 +1,104 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+from main.models import Project
+
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+
+def get_cached_user(user_id):
+    """
+    THIS METHOD RETURNS A User ROW THROUGH A SHORT-TTL IN-PROCESS CACHE
+    set AUTH_USER_CACHE_TTL to 0 to always read from the database
+    """
+    user = _get_cached(user_id)
+    if user is None:
+        user = get_user_model().objects.get(id=user_id)
+        _set_cached(user_id, user)
+
+    return user
+
+
+async def aget_cached_user(user_id):
+    """
+    async variant of get_cached_user
+    """
+    user = _get_cached(user_id)
+    if user is None:
+        user = await get_user_model().objects.aget(id=user_id)
+        _set_cached(user_id, user)
+
+    return user
+
+
+def _get_cached(user_id):
+    if settings.AUTH_USER_CACHE_TTL <= 0:
+        return None
+
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+    return None
+
+
+def _set_cached(user_id, user):
+    ttl = settings.AUTH_USER_CACHE_TTL
+    if ttl <= 0:
+        return
+
+    now = time.monotonic()
+    with _user_cache_lock:
+        if len(_user_cache) >= settings.AUTH_USER_CACHE_SIZE:
+            # drop expired entries first, then the oldest ones
+            expired = [
+                key for key, (expires, _) in _user_cache.items() if expires <= now
+            ]
+            for key in expired:
+                del _user_cache[key]
+            while len(_user_cache) >= settings.AUTH_USER_CACHE_SIZE:
+                del _user_cache[next(iter(_user_cache))]
+
+        _user_cache[user_id] = (now + ttl, user)
+
+
+class ProjectTokenUser(TokenUser):
+    """
+    TOKEN BACKED USER FOR THE PROJECT / TASK API VIEWS
+
+    Used with JWTStatelessUserAuthentication (SIMPLE_JWT["TOKEN_USER_CLASS"]):
+    request.user.id is read from the token claims, so authenticating a
+    request costs no query. The User row is only loaded by get_user(), which
+    fails with 401 like JWTAuthentication when the user was deleted since.
+
+    Like any stateless token, it stays valid until it expires even if the
+    user is deactivated in the meantime.
+    """
+
+    @property
+    def projects(self):
+        return Project.objects.for_user(self.id)
+
+    def get_user(self):
+        try:
+            return get_cached_user(self.id)
+        except get_user_model().DoesNotExist:
+            raise get_user_not_found()
+
+    async def aget_user(self):
+        try:
+            return await aget_cached_user(self.id)
+        except get_user_model().DoesNotExist:
+            raise get_user_not_found()
+
+
+def get_user_not_found():
+    # the error JWTAuthentication raises for a token of a deleted user
+    return AuthenticationFailed("User not found", code="user_not_found")
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.db.models import Case, IntegerField, Q, Value, When
 
 
 class EmailAndUsernameBackend(ModelBackend):
@@ -10,20 +11,26 @@ class EmailAndUsernameBackend(ModelBackend):
     def authenticate(self, request, email=None, password=None, **kwargs):
         User = get_user_model()
 
-        user = User.objects.filter(email=email).first()
-        if user and user.check_password(password):
-            return user
-
-        elif user and not user.check_password(password):
+        # a single query for both lookups, an e-mail match wins over a username match
+        user = (
+            User.objects.filter(Q(email=email) | Q(username=email))
+            .annotate(
+                email_match=Case(
+                    When(email=email, then=Value(0)),
+                    default=Value(1),
+                    output_field=IntegerField(),
+                )
+            )
+            .order_by("email_match", "id")
+            .first()
+        )
+
+        if not user:
+            raise Exception("User does not exist")
+
+        # hashes the password once; check_password also re-hashes the stored
+        # password when PASSWORD_HASHERS prefers a different hasher
+        if not user.check_password(password):
             raise Exception("Invalid Credentials")
 
-        elif not user:
-            user = User.objects.filter(username=email).first()
-            if user and user.check_password(password):
-                return user
-
-            elif user and not user.check_password(password):
-                raise Exception("Invalid Credentials")
-
-            elif not user:
-                raise Exception("User does not exist")
+        return user
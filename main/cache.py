@@ -0,0 +1,141 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from main.conditional import (
+    get_normalized_params,
+    get_not_modified_response,
+    set_etag,
+)
+
+
+def get_list_version_key(user_id):
+    return f"tms:list-version:{user_id}"
+
+
+def get_list_version(user_id):
+    """
+    THIS METHOD RETURNS THE CURRENT LIST CACHE VERSION OF A USER
+    versions are random tokens, so an evicted version is never reused
+    """
+    key = get_list_version_key(user_id)
+
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    return version
+
+
+async def aget_list_version(user_id):
+    """
+    async variant of get_list_version
+    """
+    key = get_list_version_key(user_id)
+
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        version = await cache.aget(key)
+
+    return version
+
+
+def bump_list_version(user_id):
+    """
+    THIS METHOD INVALIDATES EVERY CACHED LIST PAGE OF A USER
+    the bump runs after the surrounding transaction commits, so a concurrent
+    read cannot cache pre-commit rows under the new version
+    """
+    transaction.on_commit(
+        lambda: cache.set(get_list_version_key(user_id), uuid.uuid4().hex, None)
+    )
+
+
+def get_list_cache_key(resource, request, version):
+    params = get_normalized_params(request)
+    params_hash = hashlib.md5(params.encode("utf-8")).hexdigest()
+
+    # cached pages are (data, ETag) pairs
+    return f"tms:list-page:{resource}:{request.user.id}:{version}:{params_hash}"
+
+
+def get_cached_response(request, cached):
+    data, etag = cached
+
+    not_modified = get_not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = Response(data, status=status.HTTP_200_OK)
+    return set_etag(response, etag)
+
+
+def get_cacheable_response(response):
+    if response.status_code != status.HTTP_200_OK:
+        return None
+
+    return response.data, response.get("ETag")
+
+
+def cache_list_response(resource):
+    """
+    READ-THROUGH CACHE FOR THE PER-USER LIST ENDPOINTS
+    works on both sync and async view methods
+
+    usage:
+        @cache_list_response("task")
+        def get(self, request):
+            ...
+    """
+
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                version = await aget_list_version(request.user.id)
+                key = get_list_cache_key(resource, request, version)
+
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return get_cached_response(request, cached)
+
+                response = await view_method(self, request, *args, **kwargs)
+
+                cached = get_cacheable_response(response)
+                if cached is not None:
+                    await cache.aset(key, cached, settings.LIST_CACHE_TIMEOUT)
+
+                return response
+
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            version = get_list_version(request.user.id)
+            key = get_list_cache_key(resource, request, version)
+
+            cached = cache.get(key)
+            if cached is not None:
+                return get_cached_response(request, cached)
+
+            response = view_method(self, request, *args, **kwargs)
+
+            cached = get_cacheable_response(response)
+            if cached is not None:
+                cache.set(key, cached, settings.LIST_CACHE_TIMEOUT)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,84 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+
+
+def get_normalized_params(request):
+    # sorted so ?a=1&b=2 and ?b=2&a=1 are treated as the same list
+    return urlencode(sorted(request.GET.lists()), doseq=True)
+
+
+def get_list_etag(request, queryset, updated_fields=("updated_at",)):
+    """
+    THIS METHOD COMPUTES THE ETag OF A FILTERED LIST
+    with one aggregate query (row count + newest updated_at), so unchanged
+    lists can be answered with 304 before anything is serialized.
+
+    Lists get no Last-Modified: a delete lowers the row count but does not
+    move the newest updated_at, so If-Modified-Since would answer 304 for a
+    list that lost rows.
+    """
+    aggregates = get_etag_aggregates(updated_fields)
+    values = queryset.order_by().aggregate(**aggregates)
+
+    return build_etag(request, values)
+
+
+async def aget_list_etag(request, queryset, updated_fields=("updated_at",)):
+    """
+    async variant of get_list_etag
+    """
+    aggregates = get_etag_aggregates(updated_fields)
+    values = await queryset.order_by().aaggregate(**aggregates)
+
+    return build_etag(request, values)
+
+
+def get_etag_aggregates(updated_fields):
+    aggregates = {"count": Count("id")}
+    for index, field in enumerate(updated_fields):
+        aggregates[f"updated_{index}"] = Max(field)
+
+    return aggregates
+
+
+def build_etag(request, values):
+    updated_keys = [key for key in values if key.startswith("updated_")]
+
+    raw = ":".join(
+        [
+            str(request.user.id),
+            request.path,
+            get_normalized_params(request),
+            str(values["count"]),
+            *(str(values[key]) for key in updated_keys),
+        ]
+    )
+
+    return '"%s"' % hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def get_not_modified_response(request, etag):
+    """
+    THIS METHOD RETURNS A 304 RESPONSE WHEN THE CLIENT'S If-None-Match STILL
+    MATCHES, OTHERWISE None
+    """
+    if etag is None:
+        return None
+
+    response = get_conditional_response(request, etag=etag)
+
+    if response is not None:
+        set_etag(response, etag)
+
+    return response
+
+
+def set_etag(response, etag):
+    # responses without an ETag (e.g. the cached task stats) get no header
+    if etag is not None:
+        response["ETag"] = etag
+
+    return response
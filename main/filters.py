@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from main.models import Project
+from main.models import Task as ProjectTask
+
+BOOLEAN_OPTIONS = {"true": True, "1": True, "false": False, "0": False}
+
+
+class ListFilter:
+    """
+    FILTER LAYER FOR THE LIST ENDPOINTS
+
+    Validates the list query params once and chains every requested filter
+    onto the user's queryset, so e.g. due_date_* + search + status runs as a
+    single SQL query instead of one exclusive branch.
+
+    usage:
+        list_filter = TaskFilter(request.GET, user_id=request.user.id)
+        if not list_filter.is_valid():
+            ... list_filter.error ...
+        queryset = list_filter.qs
+    """
+
+    model = None
+
+    # query param prefix -> queryset method taking (start_date, end_date)
+    date_filters = {}
+
+    def __init__(self, params, user_id):
+        self.params = params
+        self.user_id = user_id
+        self.error = None
+
+    def is_valid(self):
+        for prefix in self.date_filters:
+            start_date, end_date = self.get_date_range(prefix)
+
+            if start_date and not end_date:
+                self.error = "End date is required"
+                return False
+
+            if end_date and not start_date:
+                self.error = "Start date is required"
+                return False
+
+            if start_date and end_date:
+                try:
+                    datetime.strptime(start_date, "%Y-%m-%d")
+                    datetime.strptime(end_date, "%Y-%m-%d")
+                except ValueError:
+                    self.error = "Invalid date format. Date format should be YYYY-MM-DD"
+                    return False
+
+        is_active = self.params.get("is_active")
+        if is_active and is_active.lower() not in BOOLEAN_OPTIONS:
+            self.error = "Invalid is_active option"
+            return False
+
+        return True
+
+    def get_date_range(self, prefix):
+        return self.params.get(f"{prefix}_from"), self.params.get(f"{prefix}_to")
+
+    def get_queryset(self):
+        return self.model.objects.for_user(self.user_id)
+
+    def filter_queryset(self, queryset):
+        for prefix, method in self.date_filters.items():
+            start_date, end_date = self.get_date_range(prefix)
+            if start_date and end_date:
+                queryset = getattr(queryset, method)(start_date, end_date)
+
+        search = self.params.get("search")
+        if search:
+            queryset = queryset.search(
+                search, mode=self.params.get("search_mode", "contains")
+            )
+
+        is_active = self.params.get("is_active")
+        if is_active:
+            queryset = queryset.filter(is_active=BOOLEAN_OPTIONS[is_active.lower()])
+
+        return queryset
+
+    @property
+    def qs(self):
+        return self.filter_queryset(self.get_queryset())
+
+
+class ProjectFilter(ListFilter):
+    model = Project
+
+    date_filters = {"created_date": "created_between"}
+
+
+class TaskFilter(ListFilter):
+    model = ProjectTask
+
+    date_filters = {
+        "created_date": "created_between",
+        "due_date": "due_between",
+    }
+
+    status_options = [option for option, _ in ProjectTask.STATUS_OPTIONS]
+
+    def is_valid(self):
+        if not super().is_valid():
+            return False
+
+        _status = self.params.get("status")
+        if _status and _status.upper() not in self.status_options:
+            self.error = "Invalid status option"
+            return False
+
+        return True
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        _status = self.params.get("status")
+        if _status:
+            queryset = queryset.with_status(_status)
+
+        return queryset
@@ -0,0 +1,300 @@
+import codecs
+import csv
+import json
+import time
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from main.cache import bump_list_version
+from main.models import Project
+from main.models import Task as ProjectTask
+from main.serializer import ProjectSerializer, TaskSerializer
+
+# rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# per-row errors kept for the report, the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+TASK_FIELDS = ("title", "description", "due_date", "priority_level", "status")
+
+# row type of rows that could not be parsed, their data holds the errors
+INVALID_ROW = object()
+
+
+def iter_ndjson_records(lines):
+    """
+    THIS METHOD YIELDS (row number, type, data) FROM NDJSON LINES
+    the same shape as the export:
+        {"type": "project", "id": 1, "name": "", "description": ""}
+        {"type": "task", "project_id": 1, "title": "", ...}
+    """
+    for row_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, INVALID_ROW, {"non_field_errors": ["Invalid JSON"]}
+            continue
+
+        if not isinstance(row, dict):
+            yield row_number, INVALID_ROW, {
+                "non_field_errors": ["Expected an object"]
+            }
+            continue
+
+        yield row_number, row.get("type"), row
+
+
+def iter_csv_records(lines):
+    """
+    THIS METHOD YIELDS (row number, type, data) FROM CSV LINES
+    with the export's columns: project_id, project_name, project_description,
+    task_title, task_description, task_due_date, task_priority_level and
+    task_status. A row creates its project (once per project_id, or name when
+    there is no id) and, when task_title is set, one task in it.
+    """
+    reader = csv.DictReader(lines)
+    seen_projects = set()
+
+    for row in reader:
+        project_ref = row.get("project_id") or row.get("project_name")
+        has_task = bool(row.get("task_title"))
+
+        if row.get("project_name") and project_ref not in seen_projects:
+            seen_projects.add(project_ref)
+            yield reader.line_num, "project", {
+                "id": project_ref,
+                "name": row.get("project_name"),
+                "description": row.get("project_description"),
+            }
+        elif not has_task:
+            yield reader.line_num, INVALID_ROW, {
+                "non_field_errors": ["Row has neither a project nor a task"]
+            }
+
+        if has_task:
+            yield reader.line_num, "task", {
+                "project_id": project_ref,
+                **{field: row.get(f"task_{field}") for field in TASK_FIELDS},
+            }
+
+
+def check_encoding(chunks, encoding="utf-8"):
+    """
+    THIS METHOD RAISES UnicodeDecodeError IF THE BYTE CHUNKS ARE NOT `encoding`
+    run over an upload before importing it, so a bad byte late in the file
+    does not fail the import after earlier batches were committed
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        decoder.decode(chunk)
+    decoder.decode(b"", final=True)
+
+
+IMPORT_FORMATS = {
+    "ndjson": iter_ndjson_records,
+    "csv": iter_csv_records,
+}
+
+
+class Importer:
+    """
+    IMPORTS PROJECTS AND TASKS FOR ONE USER IN BATCHES
+
+    Rows are validated with ProjectSerializer / TaskSerializer and inserted
+    with bulk_create, one transaction per batch. Invalid rows are skipped and
+    reported with their row number. If reading the file fails (csv.Error,
+    UnicodeDecodeError) the batches before stay imported, and get_report()
+    tells how far the import got. A task's project_id refers to a project
+    imported earlier in the same file (by its "id" there) or to one of the
+    user's existing projects.
+
+    usage:
+        result = Importer(user_id).run(iter_ndjson_records(lines))
+    """
+
+    def __init__(self, user_id, batch_size=IMPORT_BATCH_SIZE):
+        self.user_id = user_id
+        self.batch_size = batch_size
+
+        # file project id -> new project id
+        self.project_refs = {}
+        self.existing_projects = set()
+
+        self.rows = 0
+        self.last_row_number = None
+        self.projects_created = 0
+        self.tasks_created = 0
+        self.error_count = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    def run(self, records, on_batch=None):
+        started = time.perf_counter()
+
+        try:
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+                    if on_batch is not None:
+                        on_batch(self)
+
+            if batch:
+                self.import_batch(batch)
+                if on_batch is not None:
+                    on_batch(self)
+        finally:
+            self.elapsed = time.perf_counter() - started
+
+        return self
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def get_report(self):
+        return {
+            "rows": self.rows,
+            "projects_created": self.projects_created,
+            "tasks_created": self.tasks_created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+    def add_error(self, row_number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def import_batch(self, batch):
+        # a CSV line yields a project and a task record with the same row
+        # number, possibly at the end of one batch and the start of the next
+        for row_number, _, _ in batch:
+            if row_number != self.last_row_number:
+                self.rows += 1
+                self.last_row_number = row_number
+
+        first_error = len(self.errors)
+
+        # one serializer per batch, building its fields costs more than
+        # validating a row (this is what many=True does for a valid list)
+        project_serializer = ProjectSerializer()
+        task_serializer = TaskSerializer()
+
+        projects = []
+        task_rows = []
+        for row_number, row_type, data in batch:
+            if row_type == "project":
+                try:
+                    validated_data = project_serializer.run_validation(data)
+                except ValidationError as e:
+                    self.add_error(row_number, e.detail)
+                    continue
+
+                project = Project(user_id=self.user_id, **validated_data)
+                projects.append((data.get("id"), project))
+            elif row_type == "task":
+                task_rows.append((row_number, data))
+            elif row_type is INVALID_ROW:
+                self.add_error(row_number, data)
+            else:
+                self.add_error(row_number, {"type": ["Expected project or task"]})
+
+        with transaction.atomic():
+            Project.create_many([project for _, project in projects])
+
+            for ref, project in projects:
+                if ref not in (None, ""):
+                    self.project_refs[str(ref)] = project.id
+
+            self.load_existing_projects(data.get("project_id") for _, data in task_rows)
+
+            tasks = []
+            for row_number, data in task_rows:
+                project_id = self.resolve_project(data.get("project_id"))
+                if project_id is None:
+                    self.add_error(row_number, {"project_id": ["Project not found"]})
+                    continue
+
+                try:
+                    validated_data = task_serializer.run_validation(
+                        {
+                            **data,
+                            "project_id": project_id,
+                            "due_date": self.to_date(data.get("due_date")),
+                        }
+                    )
+                except ValidationError as e:
+                    self.add_error(row_number, e.detail)
+                    continue
+
+                tasks.append(
+                    ProjectTask(
+                        project_id=project_id,
+                        **{field: validated_data.get(field) for field in TASK_FIELDS},
+                    )
+                )
+
+            ProjectTask.create_many(tasks)
+
+            # bulk_create sends no signals
+            if projects or tasks:
+                bump_list_version(self.user_id)
+
+        self.projects_created += len(projects)
+        self.tasks_created += len(tasks)
+
+        # tasks are checked after the batch's projects, keep errors in file order
+        self.errors[first_error:] = sorted(
+            self.errors[first_error:], key=lambda error: error["row"]
+        )
+
+    def load_existing_projects(self, refs):
+        # one query per batch for the user's projects referenced by id
+        ids = set()
+        for ref in refs:
+            if str(ref) in self.project_refs:
+                continue
+            try:
+                ids.add(int(ref))
+            except (TypeError, ValueError):
+                pass
+
+        ids -= self.existing_projects
+        if ids:
+            self.existing_projects.update(
+                Project.objects.for_user(self.user_id)
+                .filter(id__in=ids)
+                .values_list("id", flat=True)
+            )
+
+    def resolve_project(self, ref):
+        if str(ref) in self.project_refs:
+            return self.project_refs[str(ref)]
+
+        try:
+            project_id = int(ref)
+        except (TypeError, ValueError):
+            return None
+
+        return project_id if project_id in self.existing_projects else None
+
+    @staticmethod
+    def to_date(value):
+        # accept the export's datetimes as well as plain dates
+        if isinstance(value, str):
+            parsed = parse_datetime(value)
+            if parsed is not None:
+                return parsed.date().isoformat()
+
+        return value
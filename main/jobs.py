@@ -0,0 +1,179 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from main.models import Job
+
+logger = logging.getLogger(__name__)
+
+# job kind -> dotted path of the function running it; the function takes the
+# Job and returns its JSON result
+JOB_HANDLERS = {
+    "purge_project": "main.purge.run_purge_job",
+}
+
+# longest wait (seconds) between retries while the database is unreachable
+MAX_ERROR_BACKOFF = 30
+
+
+def enqueue(kind, payload=None, user_id=None, run_at=None):
+    """
+    THIS METHOD QUEUES A JOB FOR THE WORKERS
+    the job is a row in the current transaction, workers only see it once
+    that commits
+    Arguments:
+        kind {str} -- a JOB_HANDLERS key
+        payload {dict} -- JSON arguments of the job
+        user_id {int} -- the user allowed to poll the job
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        user_id=user_id,
+        run_at=run_at or timezone.now(),
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim_job():
+    """
+    THIS METHOD MARKS THE NEXT DUE JOB AS RUNNING AND RETURNS IT, OR None
+    SKIP LOCKED lets concurrent workers claim different jobs without waiting
+    on each other's row locks
+    """
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status="QUEUED", run_at__lte=timezone.now())
+            .order_by("run_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = "RUNNING"
+        job.attempts += 1
+        job.locked_at = timezone.now()
+        job.save(update_fields=["status", "attempts", "locked_at", "updated_at"])
+
+    return job
+
+
+def get_retry_delay(attempts):
+    # JOB_RETRY_DELAY, then doubled after every failed attempt
+    return timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """
+    THIS METHOD RUNS A CLAIMED JOB AND STORES ITS OUTCOME
+    a failed job is queued again after get_retry_delay() until it has used
+    its max_attempts. The outcome is only stored while the job is still
+    RUNNING under this claim; once requeued as stale (and maybe claimed again)
+    the job belongs to the other worker.
+    """
+    try:
+        handler = import_string(JOB_HANDLERS[job.kind])
+        result = handler(job)
+    except Exception as e:
+        logger.exception("job %s (%s) failed", job.id, job.kind)
+        job.error = f"{type(e).__name__}: {e}"
+
+        if job.attempts < job.max_attempts:
+            job.status = "QUEUED"
+            job.run_at = timezone.now() + get_retry_delay(job.attempts)
+        else:
+            job.status = "FAILED"
+            job.finished_at = timezone.now()
+    else:
+        job.status = "SUCCEEDED"
+        job.result = result
+        job.error = ""
+        job.finished_at = timezone.now()
+
+    job.locked_at = None
+    job.updated_at = timezone.now()
+    updated = Job.objects.filter(
+        id=job.id, status="RUNNING", attempts=job.attempts
+    ).update(
+        status=job.status,
+        run_at=job.run_at,
+        locked_at=None,
+        result=job.result,
+        error=job.error,
+        finished_at=job.finished_at,
+        updated_at=job.updated_at,
+    )
+
+    if not updated:
+        logger.warning(
+            "job %s (%s) attempt %s finished after it was requeued, "
+            "its outcome was not stored",
+            job.id,
+            job.kind,
+            job.attempts,
+        )
+
+    return job
+
+
+def requeue_stale_jobs():
+    """
+    THIS METHOD QUEUES AGAIN THE RUNNING JOBS WHOSE WORKER DIED
+    (no progress for JOB_LOCK_TIMEOUT seconds), jobs out of attempts fail
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status="RUNNING", locked_at__lt=cutoff)
+    error = "Worker lost"
+
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status="FAILED", locked_at=None, error=error, finished_at=timezone.now()
+    )
+    queued = stale.update(status="QUEUED", locked_at=None, error=error)
+
+    return queued, failed
+
+
+def work(stop_event=None, burst=False, poll_interval=1.0):
+    """
+    THIS METHOD RUNS JOBS UNTIL stop_event (a threading.Event) IS SET
+    Arguments:
+        burst {bool} -- return once no job is due instead of polling
+    returns the number of jobs run
+    """
+    stop_event = stop_event or threading.Event()
+
+    count = 0
+    failures = 0
+    while not stop_event.is_set():
+        try:
+            job = claim_job()
+            if job is None:
+                if burst:
+                    break
+                stop_event.wait(poll_interval)
+                continue
+
+            run_job(job)
+        except DatabaseError:
+            # e.g. the database restarted: drop the broken connection and
+            # retry; a job whose outcome was lost is requeued as stale
+            failures += 1
+            logger.exception("worker database error, retrying")
+            close_old_connections()
+            stop_event.wait(min(poll_interval * 2**failures, MAX_ERROR_BACKOFF))
+            continue
+
+        failures = 0
+        count += 1
+
+    return count
@@ -0,0 +1,174 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from main import conditional
+from main.pagination import KeysetPagination
+
+# the steps of the project and task list endpoints, shared by the sync views
+# (main/views.py) and the async ones (main/async_views.py)
+
+SORT_OPTIONS = ["asc", "desc", "relevance"]
+PAGINATION_OPTIONS = ["page", "cursor"]
+# search= matches substrings by default, fulltext is opt-in
+SEARCH_MODE_OPTIONS = ["contains", "fulltext"]
+
+# columns whose newest value goes into the ETag of a list; task changes move
+# their project's last_activity_at and every task nests its project
+PROJECT_UPDATED_FIELDS = ("updated_at", "last_activity_at")
+TASK_UPDATED_FIELDS = (
+    "updated_at",
+    "project__updated_at",
+    "project__last_activity_at",
+)
+
+# keyset pagination ordering for each sort_by option
+KEYSET_ORDERING = {
+    None: ("id",),
+    "asc": ("id",),
+    "desc": ("-id",),
+    "relevance": ("-rank", "-id"),
+}
+
+
+def get_invalid_list_response(message):
+    data = {
+        "error": True,
+        "code": "40007",
+        "message": message,
+    }
+
+    return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+
+def get_list_params_error(request):
+    """
+    THIS METHOD VALIDATES THE sort_by / pagination / search PARAMS OF A LIST
+    returns the error message of the first invalid param, otherwise None
+    """
+    sort_by = request.GET.get("sort_by")
+    search = request.GET.get("search")
+    pagination = request.GET.get("pagination", "page")
+    search_mode = request.GET.get("search_mode", "contains")
+
+    if sort_by and sort_by not in SORT_OPTIONS:
+        return "Invalid sort option"
+    if pagination not in PAGINATION_OPTIONS:
+        return "Invalid pagination option"
+    if search_mode not in SEARCH_MODE_OPTIONS:
+        return "Invalid search mode"
+    if sort_by == "relevance" and not search:
+        return "Search term is required to sort by relevance"
+    if sort_by == "relevance" and search_mode != "fulltext":
+        return "Sorting by relevance requires search_mode=fulltext"
+
+    return None
+
+
+def parse_list_request(request, filter_class, serializer_class):
+    """
+    THIS METHOD VALIDATES EVERY PARAM OF A LIST REQUEST
+    before the conditional validators are computed, so a bad request never
+    costs a query
+    Arguments:
+        filter_class {type} -- ProjectFilter / TaskFilter
+        serializer_class {type} -- LeanProjectSerializer / LeanTaskSerializer
+    returns (list filter, lean serializer, None) or (None, None, 400 response)
+    """
+    error = get_list_params_error(request)
+    if error is not None:
+        return None, None, get_invalid_list_response(error)
+
+    # every filter param chains into a single query
+    list_filter = filter_class(request.GET, user_id=request.user.id)
+    if not list_filter.is_valid():
+        return None, None, get_invalid_list_response(list_filter.error)
+
+    # sparse fieldset, e.g. ?fields=id,title,project&expand=project
+    try:
+        lean_serializer = serializer_class.from_params(request.GET)
+    except ValueError as e:
+        return None, None, get_invalid_list_response(str(e))
+
+    return list_filter, lean_serializer, None
+
+
+def uses_list_etag(request):
+    # a keyset page reads only its own rows, an ETag would cost a COUNT / MAX
+    # over the whole filtered list on every scroll
+    return request.GET.get("pagination", "page") != "cursor"
+
+
+def get_list_etag(request, queryset, updated_fields):
+    """
+    THIS METHOD RETURNS THE ETag OF A PAGE NUMBER LIST, None FOR CURSOR PAGES
+    """
+    if not uses_list_etag(request):
+        return None
+
+    return conditional.get_list_etag(request, queryset, updated_fields=updated_fields)
+
+
+async def aget_list_etag(request, queryset, updated_fields):
+    """
+    async variant of get_list_etag
+    """
+    if not uses_list_etag(request):
+        return None
+
+    return await conditional.aget_list_etag(
+        request, queryset, updated_fields=updated_fields
+    )
+
+
+def get_list_rows(request, model, queryset, lean_serializer):
+    """
+    THIS METHOD SORTS A FILTERED LIST AND READS IT AS values() ROWS
+    which the lean serializer turns into dicts without DRF fields
+    """
+    sort_by = request.GET.get("sort_by")
+    if sort_by:
+        queryset = model.sort_data(
+            queryset=queryset,
+            sort_by=sort_by,
+            search_term=request.GET.get("search"),
+        )
+
+    return lean_serializer.get_rows(queryset)
+
+
+def get_list_paginator(request):
+    if request.GET.get("pagination", "page") == "cursor":
+        return KeysetPagination(ordering=KEYSET_ORDERING[request.GET.get("sort_by")])
+
+    paginator = PageNumberPagination()
+    paginator.page_size = 10
+    return paginator
+
+
+async def apaginate_rows(paginator, rows, request):
+    """
+    THIS METHOD PAGINATES LIST ROWS FOR THE ASYNC VIEWS, raises InvalidCursor
+    """
+    if isinstance(paginator, KeysetPagination):
+        return await paginator.apaginate_queryset(rows, request)
+
+    # django's Paginator (COUNT + slice) has no async API
+    return await sync_to_async(paginator.paginate_queryset)(rows, request)
+
+
+def get_invalid_cursor_response():
+    return get_invalid_list_response("Invalid cursor")
+
+
+def get_list_response(paginator, lean_serializer, page, etag):
+    data = {
+        "error": False,
+        "code": "200",
+        "message": "data fetched successfully",
+        "data": lean_serializer.to_representation_many(page),
+    }
+
+    response = paginator.get_paginated_response(data)
+    return conditional.set_etag(response, etag)
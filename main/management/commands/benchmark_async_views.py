@@ -0,0 +1,165 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from main.async_views import AsyncProjectApiView, AsyncProjectTaskApiView
+from main.models import Project
+from main.models import Task as ProjectTask
+from main.views import ProjectApiView, ProjectTaskApiView
+
+
+class Command(BaseCommand):
+    """
+    LOAD TEST OF THE SYNC (WSGI) VS ASYNC (ASGI) PROJECT / TASK VIEWS
+
+    Every query is delayed by --latency seconds to simulate a slow database.
+    The sync views run on a pool of --workers threads, like sync gunicorn
+    workers; the async views run on one event loop with up to --concurrency
+    requests in flight, each with its own thread for the ORM like under
+    core/asgi.py.
+
+    usage: python manage.py benchmark_async_views --requests 200 --latency 0.05
+
+    The benchmark data is committed (the requests run on other connections)
+    and deleted at the end.
+    """
+
+    help = "Compare throughput of the sync and async list views under DB latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--latency", type=float, default=0.05)
+        parser.add_argument("--resource", choices=["project", "task"], default="task")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            username="benchmark-async-views", password=None
+        )
+
+        try:
+            self.create_data(user)
+            self.run(user, options)
+        finally:
+            user.delete()
+
+    def create_data(self, user):
+        project = Project.create(user=user, name="benchmark", description="benchmark")
+        ProjectTask.create_many(
+            [
+                ProjectTask(
+                    project=project,
+                    title=f"task {index}",
+                    description="benchmark",
+                    due_date=timezone.now() + timedelta(days=index),
+                    priority_level="LOW",
+                )
+                for index in range(50)
+            ]
+        )
+
+    def run(self, user, options):
+        latency = options["latency"]
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        factory = APIRequestFactory()
+        token = AccessToken.for_user(user)
+        path = f"/api/{options['resource']}/"
+
+        def build_request():
+            return factory.get(path, HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        if options["resource"] == "project":
+            sync_view = ProjectApiView.as_view()
+            async_view = AsyncProjectApiView.as_view()
+        else:
+            sync_view = ProjectTaskApiView.as_view()
+            async_view = AsyncProjectTaskApiView.as_view()
+
+        self.stdout.write(
+            f"{'mode':<8} {'in flight':>10} {'requests/sec':>14} "
+            f"{'p50 ms':>8} {'p95 ms':>8}"
+        )
+
+        # measure the database path, not the list cache
+        with override_settings(LIST_CACHE_TIMEOUT=0):
+            connection_created.connect(add_delay)
+            try:
+                self.report(
+                    "wsgi",
+                    options["workers"],
+                    self.run_sync(sync_view, build_request, options),
+                )
+                self.report(
+                    "asgi",
+                    options["concurrency"],
+                    asyncio.run(self.run_async(async_view, build_request, options)),
+                )
+            finally:
+                connection_created.disconnect(add_delay)
+
+    def run_sync(self, view, build_request, options):
+        def handle_request(_):
+            started = time.perf_counter()
+            try:
+                view(build_request())
+            finally:
+                # CONN_MAX_AGE=0 behaviour, the connection ends with the request
+                connections.close_all()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            durations = list(executor.map(handle_request, range(options["requests"])))
+
+        return time.perf_counter() - started, durations
+
+    async def run_async(self, view, build_request, options):
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def handle_request():
+            async with semaphore:
+                started = time.perf_counter()
+                # one ORM thread per request, as ASGIHandler does
+                async with ThreadSensitiveContext():
+                    try:
+                        await view(build_request())
+                    finally:
+                        await sync_to_async(connections.close_all)()
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        durations = await asyncio.gather(
+            *(handle_request() for _ in range(options["requests"]))
+        )
+
+        return time.perf_counter() - started, durations
+
+    def report(self, mode, in_flight, result):
+        elapsed, durations = result
+        percentiles = statistics.quantiles(durations, n=20)
+
+        self.stdout.write(
+            f"{mode:<8} {in_flight:>10} {len(durations) / elapsed:>14.1f} "
+            f"{percentiles[9] * 1000:>8.1f} {percentiles[18] * 1000:>8.1f}"
+        )
@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    COMPARES PER-REQUEST COST OF JWTAuthentication (LOADS THE User ROW) WITH
+    JWTStatelessUserAuthentication + ProjectTokenUser (CLAIMS ONLY)
+
+    usage: python manage.py benchmark_authentication --requests 2000
+    the benchmark user is created inside a transaction that is rolled back
+    """
+
+    help = "Compare queries and time per request of the JWT authentication classes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["requests"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, requests):
+        user = get_user_model().objects.create_user(
+            username="benchmark-authentication", password=None
+        )
+        token = AccessToken.for_user(user)
+        request = APIRequestFactory().get(
+            "/api/task/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.stdout.write(
+            f"{'authentication':<32} {'queries/request':>16} {'us/request':>12}"
+        )
+
+        for authentication_class in (JWTAuthentication, JWTStatelessUserAuthentication):
+            authentication = authentication_class()
+
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                for _ in range(requests):
+                    authenticated_user, _ = authentication.authenticate(request)
+                    authenticated_user.id
+                elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{authentication_class.__name__:<32} "
+                f"{len(context.captured_queries) / requests:>16.2f} "
+                f"{elapsed / requests * 1_000_000:>12.1f}"
+            )
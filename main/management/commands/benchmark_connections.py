@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+
+from main.models import Task as ProjectTask
+
+
+class Command(BaseCommand):
+    """
+    COMPARES REQUESTS/SEC WITH A NEW DATABASE CONNECTION PER REQUEST VERSUS
+    PERSISTENT CONNECTIONS (CONN_MAX_AGE), WITH AND WITHOUT HEALTH CHECKS
+
+    Each simulated request runs the same request_started / request_finished
+    connection handling as a real one (close_old_connections) around
+    --queries small queries.
+
+    usage: python manage.py benchmark_connections --requests 500
+    """
+
+    help = "Measure the cost of opening a database connection per request"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--queries", type=int, default=3)
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        keys = ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")
+        original = {key: settings_dict[key] for key in keys}
+
+        self.stdout.write(
+            f"{'CONN_MAX_AGE':<14} {'health checks':<14} {'requests/sec':>14} "
+            f"{'connections':>12}"
+        )
+
+        try:
+            for conn_max_age, health_checks in ((0, False), (60, False), (60, True)):
+                settings_dict["CONN_MAX_AGE"] = conn_max_age
+                settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+                connection.close()
+
+                self.run(conn_max_age, health_checks, options)
+        finally:
+            settings_dict.update(original)
+            connection.close()
+
+    def run(self, conn_max_age, health_checks, options):
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection)
+
+        connection_created.connect(count_connection)
+        try:
+            started = time.perf_counter()
+            for _ in range(options["requests"]):
+                close_old_connections()  # request_started
+                for _ in range(options["queries"]):
+                    ProjectTask.objects.filter(id=0).exists()
+                close_old_connections()  # request_finished
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connection)
+
+        self.stdout.write(
+            f"{conn_max_age:<14} {str(health_checks):<14} "
+            f"{options['requests'] / elapsed:>14.1f} {len(opened):>12}"
+        )
@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.module_loading import import_string
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    MEASURES LOGIN THROUGHPUT OF authenticate() FOR EACH USABLE PASSWORD HASHER
+
+    usage: python manage.py benchmark_login --logins 20
+    the benchmark user is created inside a transaction that is rolled back
+    """
+
+    help = "Measure logins/sec and queries/login for each configured password hasher"
+
+    password = "benchmark-password"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=20)
+        parser.add_argument(
+            "--hashers",
+            nargs="+",
+            default=settings.PASSWORD_HASHERS,
+            help="hasher import paths, defaults to PASSWORD_HASHERS",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'hasher':<24} {'login by':<10} {'logins/sec':>12} {'queries/login':>14}"
+        )
+
+        for hasher_path in options["hashers"]:
+            hasher = import_string(hasher_path)()
+            if hasher.library:
+                try:
+                    hasher._load_library()
+                except ValueError:
+                    self.stdout.write(f"{hasher_path}: library not installed, skipped")
+                    continue
+
+            others = [path for path in settings.PASSWORD_HASHERS if path != hasher_path]
+            with override_settings(PASSWORD_HASHERS=[hasher_path, *others]):
+                try:
+                    with transaction.atomic():
+                        self.run(options["logins"])
+                        raise Rollback()
+                except Rollback:
+                    pass
+
+    def run(self, logins):
+        user = get_user_model().objects.create_user(
+            username="benchmark-login",
+            email="benchmark-login@example.com",
+            password=self.password,
+        )
+        algorithm = get_hasher().algorithm
+
+        for login_by in ("email", "username"):
+            identifier = getattr(user, login_by)
+
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                for _ in range(logins):
+                    authenticate(email=identifier, password=self.password)
+                elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{algorithm:<24} {login_by:<10} {logins / elapsed:>12.1f} "
+                f"{len(context.captured_queries) / logins:>14.2f}"
+            )
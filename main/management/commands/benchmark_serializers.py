@@ -0,0 +1,116 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from main.models import Project
+from main.models import Task as ProjectTask
+from main.renderers import FastJSONRenderer
+from main.serializer import LeanTaskSerializer, TaskModelSerializer
+
+
+class Command(BaseCommand):
+    """
+    COMPARES SERIALIZING --tasks TASKS WITH TaskModelSerializer + JSONRenderer
+    VERSUS THE LEAN READ PATH (values() + LeanTaskSerializer + FastJSONRenderer)
+
+    Query, serialize and render times are reported separately, best of
+    --repeat runs, and the two outputs are checked to be the same bytes.
+
+    usage: python manage.py benchmark_serializers --tasks 10000
+
+    The benchmark data is committed and deleted at the end.
+    """
+
+    help = "Measure the cost of the model serializers against the lean read path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            username="benchmark-serializers", password=None
+        )
+
+        try:
+            self.create_data(user, options["tasks"])
+            self.run(user, options)
+        finally:
+            user.delete()
+
+    def create_data(self, user, count):
+        projects = [
+            Project.create(user=user, name=f"project {index}", description="benchmark")
+            for index in range(10)
+        ]
+        ProjectTask.create_many(
+            [
+                ProjectTask(
+                    project=projects[index % len(projects)],
+                    title=f"task {index}",
+                    description="benchmark",
+                    due_date=timezone.now() + timedelta(days=index % 365),
+                    priority_level="LOW",
+                    status=ProjectTask.STATUS_OPTIONS[index % 3][0],
+                )
+                for index in range(count)
+            ]
+        )
+
+    def run(self, user, options):
+        queryset = ProjectTask.objects.for_user(user.id).order_by("id")
+        lean_serializer = LeanTaskSerializer()
+
+        # name -> (read the rows, serialize them, renderer)
+        paths = {
+            "model": (
+                lambda: list(queryset.with_related()),
+                lambda tasks: TaskModelSerializer(tasks, many=True).data,
+                JSONRenderer(),
+            ),
+            "lean": (
+                lambda: list(lean_serializer.get_rows(queryset)),
+                lean_serializer.to_representation_many,
+                FastJSONRenderer(),
+            ),
+        }
+
+        self.stdout.write(
+            f"{'path':<8} {'query ms':>10} {'serialize ms':>14} {'render ms':>11} "
+            f"{'total ms':>10}"
+        )
+
+        outputs = {}
+        for name, path in paths.items():
+            best = None
+            for _ in range(options["repeat"]):
+                timings, outputs[name] = self.measure(*path)
+                if best is None or sum(timings) < sum(best):
+                    best = timings
+
+            query, serialize, render = (timing * 1000 for timing in best)
+            self.stdout.write(
+                f"{name:<8} {query:>10.1f} {serialize:>14.1f} {render:>11.1f} "
+                f"{query + serialize + render:>10.1f}"
+            )
+
+        if outputs["model"] == outputs["lean"]:
+            self.stdout.write(self.style.SUCCESS("Outputs are identical"))
+        else:
+            self.stdout.write(self.style.ERROR("Outputs differ"))
+
+    @staticmethod
+    def measure(fetch, serialize, renderer):
+        started = time.perf_counter()
+        rows = fetch()
+        queried = time.perf_counter()
+        data = serialize(rows)
+        serialized = time.perf_counter()
+        content = renderer.render(data)
+        rendered = time.perf_counter()
+
+        return (queried - started, serialized - queried, rendered - serialized), content
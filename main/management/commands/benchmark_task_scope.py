@@ -0,0 +1,117 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.models import Project
+from main.models import Task as ProjectTask
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    COMPARES THE PLAN COST OF THE OLD project__id__in=project_ids TASK SCOPE
+    (AS A MATERIALIZED ID LIST AND AS A SUBQUERY) WITH THE JOIN BASED
+    Task.objects.for_user() SCOPE
+
+    usage: python manage.py benchmark_task_scope --projects 10 1000 50000
+    all benchmark rows are created inside a transaction that is rolled back
+    """
+
+    help = "Compare plan cost of the IN-subquery and join based task scopes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--projects", nargs="+", type=int, default=[10, 1000, 50000]
+        )
+        parser.add_argument("--tasks-per-project", type=int, default=5)
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="run EXPLAIN ANALYZE and report execution time as well",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write("This benchmark requires PostgreSQL")
+            return
+
+        self.stdout.write(
+            f"{'projects':>10} {'in-list cost':>14} {'in-subquery cost':>18} "
+            f"{'join cost':>12}"
+            + (
+                f" {'in-list ms':>12} {'in-subquery ms':>16} {'join ms':>10}"
+                if options["analyze"]
+                else ""
+            )
+        )
+
+        for project_count in options["projects"]:
+            try:
+                with transaction.atomic():
+                    row = self.run_case(
+                        project_count, options["tasks_per_project"], options["analyze"]
+                    )
+                    raise Rollback()
+            except Rollback:
+                pass
+
+            self.stdout.write(row)
+
+    def run_case(self, project_count, tasks_per_project, analyze):
+        user = get_user_model().objects.create_user(
+            username=f"benchmark-{project_count}", password=None
+        )
+
+        projects = Project.objects.bulk_create(
+            Project(user=user, name=f"project {index}", description="benchmark")
+            for index in range(project_count)
+        )
+
+        due_date = timezone.now() + timedelta(days=7)
+        ProjectTask.objects.bulk_create(
+            (
+                ProjectTask(
+                    project=project,
+                    title=f"task {index}",
+                    description="benchmark",
+                    due_date=due_date,
+                    priority_level="LOW",
+                )
+                for project in projects
+                for index in range(tasks_per_project)
+            ),
+            batch_size=5000,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        project_ids = user.projects.values_list("id", flat=True)
+        in_list_qs = ProjectTask.objects.filter(project__id__in=list(project_ids))
+        in_subquery_qs = ProjectTask.objects.filter(project__id__in=project_ids)
+        join_qs = ProjectTask.objects.for_user(user.id)
+
+        list_cost, list_time = self.explain(in_list_qs, analyze)
+        in_cost, in_time = self.explain(in_subquery_qs, analyze)
+        join_cost, join_time = self.explain(join_qs, analyze)
+
+        row = (
+            f"{project_count:>10} {list_cost:>14.2f} {in_cost:>18.2f} "
+            f"{join_cost:>12.2f}"
+        )
+        if analyze:
+            row += f" {list_time:>12.2f} {in_time:>16.2f} {join_time:>10.2f}"
+
+        return row
+
+    @staticmethod
+    def explain(queryset, analyze):
+        plan = json.loads(queryset.explain(format="json", analyze=analyze))[0]
+        return plan["Plan"]["Total Cost"], plan.get("Execution Time", 0.0)
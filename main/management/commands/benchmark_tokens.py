@@ -0,0 +1,62 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from main.tokens import issue_tokens
+
+
+class Rollback(Exception):
+    pass
+
+
+def issue_tokens_separately(user):
+    # what CreateAccountApiView / LoginApiView used to do: two independent tokens
+    refresh = TokenObtainPairSerializer().get_token(user)
+    access = AccessToken().for_user(user)
+
+    return {"refresh": str(refresh), "access": str(access)}
+
+
+class Command(BaseCommand):
+    """
+    COMPARES TOKEN PAIRS/SEC OF issue_tokens() WITH MINTING THE REFRESH AND
+    ACCESS TOKENS SEPARATELY
+
+    usage: python manage.py benchmark_tokens --pairs 5000
+    the benchmark user is created inside a transaction that is rolled back
+    """
+
+    help = "Measure token pairs/sec of the token issuing strategies"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pairs", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["pairs"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, pairs):
+        user = get_user_model().objects.create_user(
+            username="benchmark-tokens", password=None
+        )
+
+        self.stdout.write(f"{'strategy':<28} {'pairs/sec':>12} {'us/pair':>10}")
+
+        for strategy in (issue_tokens_separately, issue_tokens):
+            started = time.perf_counter()
+            for _ in range(pairs):
+                strategy(user)
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{strategy.__name__:<28} {pairs / elapsed:>12.1f} "
+                f"{elapsed / pairs * 1_000_000:>10.1f}"
+            )
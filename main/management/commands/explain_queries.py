@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from main.models import Project
+from main.models import Task as ProjectTask
+
+
+class Command(BaseCommand):
+    """
+    RUNS EXPLAIN ON EVERY Project / Task FILTER HELPER FOR ONE USER
+    SO WE CAN CHECK WHICH INDEX EACH LIST QUERY USES
+
+    usage: python manage.py explain_queries --user-id 1 [--analyze]
+    """
+
+    help = "EXPLAIN the queries built by the Project and Task filter helpers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", type=int)
+        parser.add_argument(
+            "--analyze", action="store_true", help="run EXPLAIN ANALYZE"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN output is only meaningful on PostgreSQL")
+
+        user_id = options["user_id"]
+        if user_id is None:
+            user = get_user_model().objects.order_by("id").first()
+            if user is None:
+                raise CommandError("No users found, pass --user-id")
+            user_id = user.id
+
+        end_date = timezone.now()
+        start_date = end_date - timedelta(days=30)
+
+        queries = {
+            "Project.objects.filter(user__id)": Project.objects.filter(
+                user__id=user_id
+            ),
+            "Project.filter_by_created_date": Project.filter_by_created_date(
+                start_date=start_date, end_date=end_date, user_id=user_id
+            ),
+            "Project.search_project": Project.search_project(
+                search_term="test", user_id=user_id
+            ),
+            "Project.search_project(fulltext)": Project.search_project(
+                search_term="test", user_id=user_id, mode="fulltext"
+            ),
+            "Project.sort_data(desc)": Project.sort_data(
+                queryset=Project.objects.filter(user__id=user_id), sort_by="desc"
+            ),
+            "Task.objects.for_user": ProjectTask.objects.for_user(user_id),
+            "Task.filter_by_created_date": ProjectTask.filter_by_created_date(
+                start_date=start_date, end_date=end_date, user_id=user_id
+            ),
+            "Task.filter_by_due_date": ProjectTask.filter_by_due_date(
+                start_date=start_date, end_date=end_date, user_id=user_id
+            ),
+            "Task.filter_by_status": ProjectTask.filter_by_status(
+                status="TO_DO", user_id=user_id
+            ),
+            "Task.search_task": ProjectTask.search_task(
+                search_term="test", user_id=user_id
+            ),
+            "Task.search_task(fulltext)": ProjectTask.search_task(
+                search_term="test", user_id=user_id, mode="fulltext"
+            ),
+            "Task.sort_data(desc)": ProjectTask.sort_data(
+                queryset=ProjectTask.objects.for_user(user_id), sort_by="desc"
+            ),
+        }
+
+        for name, queryset in queries.items():
+            plan = queryset.explain(analyze=options["analyze"])
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            self.stdout.write("")
@@ -0,0 +1,64 @@
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from main.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, Importer
+
+
+class Command(BaseCommand):
+    """
+    IMPORTS PROJECTS AND TASKS FROM AN NDJSON OR CSV FILE FOR ONE USER
+
+    usage: python manage.py import_tasks <username> tasks.ndjson
+           python manage.py import_tasks <username> tasks.csv --format csv
+    """
+
+    help = "Bulk import projects and tasks from an NDJSON / CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=list(IMPORT_FORMATS), default=None)
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["username"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+
+        import_format = options["format"]
+        if import_format is None:
+            import_format = "csv" if options["path"].endswith(".csv") else "ndjson"
+
+        importer = Importer(user.id, batch_size=options["batch_size"])
+
+        with open(options["path"], encoding="utf-8", newline="") as lines:
+            try:
+                importer.run(
+                    IMPORT_FORMATS[import_format](lines), on_batch=self.progress
+                )
+            except (csv.Error, UnicodeDecodeError) as e:
+                # the batches already printed by progress() stay imported
+                raise CommandError(
+                    f"Import stopped after {importer.rows} rows "
+                    f"({importer.projects_created} projects, "
+                    f"{importer.tasks_created} tasks created): {e}"
+                )
+
+        for error in importer.errors:
+            self.stderr.write(f"row {error['row']}: {dict(error['errors'])}")
+
+        self.stdout.write(
+            f"{importer.rows} rows in {importer.elapsed:.2f}s "
+            f"({importer.rows_per_second:.1f} rows/sec): "
+            f"{importer.projects_created} projects, {importer.tasks_created} tasks "
+            f"created, {importer.error_count} errors"
+        )
+
+    def progress(self, importer):
+        self.stdout.write(
+            f"{importer.rows} rows, {importer.projects_created} projects, "
+            f"{importer.tasks_created} tasks, {importer.error_count} errors"
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from main.purge import PURGE_BATCH_SIZE, get_pending_purges, purge_project
+
+
+class Command(BaseCommand):
+    """
+    PURGES EVERY DELETED PROJECT NOW, PRINTING PROGRESS AFTER EACH BATCH
+    instead of waiting for the "purge_project" jobs (e.g. no worker is running);
+    the jobs then find nothing left to delete
+
+    usage: python manage.py purge_deleted_projects [--batch-size 1000]
+    """
+
+    help = "Delete the tasks and rows of projects marked as deleted"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        project_ids = get_pending_purges()
+        self.stdout.write(f"{len(project_ids)} projects pending")
+
+        for project_id in project_ids:
+            purge_project(
+                project_id,
+                batch_size=options["batch_size"],
+                on_batch=self.report_progress,
+            )
+            self.stdout.write(f"project {project_id}: purged")
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {len(project_ids)} projects"))
+
+    def report_progress(self, project_id, deleted, total):
+        self.stdout.write(f"project {project_id}: {deleted}/{total} tasks deleted")
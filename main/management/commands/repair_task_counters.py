@@ -0,0 +1,82 @@
+import operator
+from functools import reduce
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from main.models import Project
+from main.models import Task as ProjectTask
+
+
+class Command(BaseCommand):
+    """
+    RECOMPUTES THE TASK COUNTERS OF EVERY PROJECT FROM THE TASK TABLE
+
+    usage: python manage.py repair_task_counters --batch-size 1000
+    projects are checked in id batches, one transaction per batch, and only
+    the ones with wrong counters are updated
+    """
+
+    help = "Recompute Project task counters from the tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        task_counts = (
+            ProjectTask.objects.filter(project=OuterRef("pk"))
+            .order_by()
+            .values("project")
+        )
+
+        def count(**filters):
+            counts = task_counts.annotate(count=Count("id", filter=Q(**filters)))
+            return Coalesce(
+                Subquery(counts.values("count"), output_field=IntegerField()), 0
+            )
+
+        counters = {"task_count": count()}
+        for status, column in Project.STATUS_COUNTERS.items():
+            counters[column] = count(status=status)
+
+        # a project is stale when any stored counter differs from the tasks
+        actual = {f"actual_{column}": value for column, value in counters.items()}
+        stale = reduce(
+            operator.or_,
+            (~Q(**{column: F(f"actual_{column}")}) for column in counters),
+        )
+
+        ids = Project.objects.order_by("id").values_list("id", flat=True)
+        last_id = 0
+        checked = 0
+        repaired = 0
+
+        while True:
+            batch = list(ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            with transaction.atomic():
+                stale_ids = list(
+                    Project.objects.filter(id__in=batch)
+                    .annotate(**actual)
+                    .filter(stale)
+                    .values_list("id", flat=True)
+                )
+                # moving last_activity_at also changes the lists' ETags
+                repaired += Project.objects.filter(id__in=stale_ids).update(
+                    last_activity_at=timezone.now(), **counters
+                )
+
+            checked += len(batch)
+            last_id = batch[-1]
+            self.stdout.write(f"{checked} projects checked, {repaired} repaired")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired {repaired} of {checked} projects")
+        )
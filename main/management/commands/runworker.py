@@ -0,0 +1,71 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from main.jobs import requeue_stale_jobs, work
+
+
+class Command(BaseCommand):
+    """
+    RUNS BACKGROUND JOBS (main/jobs.py) ON --workers THREADS
+    each thread claims jobs with its own database connection, several
+    runworker processes can share the same queue. Ctrl+C lets the running
+    jobs finish, then exits.
+
+    usage: python manage.py runworker --workers 4 [--burst]
+    """
+
+    help = "Run queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="exit once no job is due instead of waiting for new ones",
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+        counts = []
+
+        def run_worker():
+            try:
+                counts.append(
+                    work(stop_event, options["burst"], options["poll_interval"])
+                )
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=run_worker, name=f"worker-{index}")
+            for index in range(options["workers"])
+        ]
+
+        self.requeue_stale_jobs()
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"{len(threads)} workers started")
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                # pick up jobs whose worker died, e.g. a killed process
+                if not stop_event.wait(options["poll_interval"]):
+                    self.requeue_stale_jobs()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping, waiting for running jobs")
+        finally:
+            # on any exit (e.g. requeue_stale_jobs() raised), else the joins hang
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {sum(counts)} jobs"))
+
+    def requeue_stale_jobs(self):
+        queued, failed = requeue_stale_jobs()
+        if queued or failed:
+            self.stdout.write(f"Requeued {queued} and failed {failed} stale jobs")
@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from main.reminders import REMINDER_BATCH_SIZE, scan_due_tasks
+
+
+class Command(BaseCommand):
+    """
+    CREATES OVERDUE AND DUE_SOON REMINDERS FOR TASKS THAT CROSSED THEIR
+    THRESHOLD, OR WERE CHANGED, SINCE THE PREVIOUS RUN (main/reminders.py)
+
+    Run it from cron, or keep it running with --interval. The first run
+    reminds every open task already overdue, and the tasks due within
+    --due-soon-hours as DUE_SOON.
+
+    usage: python manage.py scan_due_tasks [--interval 300]
+    """
+
+    help = "Create reminders for overdue and soon due tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--due-soon-hours", type=int, default=settings.REMINDER_DUE_SOON_HOURS
+        )
+        parser.add_argument("--batch-size", type=int, default=REMINDER_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="seconds between scans, 0 scans once and exits",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.scan(options)
+
+            if not options["interval"]:
+                break
+
+            time.sleep(options["interval"])
+            close_old_connections()
+
+    def scan(self, options):
+        now = timezone.now()
+        # kind -> (threshold, lower bound of the first scan)
+        scans = {
+            "OVERDUE": (now, None),
+            # tasks already overdue are not due soon
+            "DUE_SOON": (now + timedelta(hours=options["due_soon_hours"]), now),
+        }
+
+        for kind, (threshold, first_scan_from) in scans.items():
+            reminders, tasks = scan_due_tasks(
+                kind, threshold, first_scan_from, options["batch_size"]
+            )
+            self.stdout.write(f"{kind}: {reminders} reminders for {tasks} tasks")
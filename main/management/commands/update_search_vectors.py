@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from main.models import Project
+from main.models import Task as ProjectTask
+
+
+class Command(BaseCommand):
+    """
+    RECOMPUTES THE STORED search_vector COLUMN OF PROJECTS AND TASKS
+    run once after adding the column, or with --all to rebuild every row
+
+    usage: python manage.py update_search_vectors [--all]
+    """
+
+    help = "Backfill the full-text search_vector of projects and tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="rebuild every row instead of only rows with no search_vector",
+        )
+
+    def handle(self, *args, **options):
+        filters = {} if options["all"] else {"search_vector__isnull": True}
+
+        projects = Project.update_search_vector(**filters)
+        tasks = ProjectTask.update_search_vector(**filters)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {projects} projects and {tasks} tasks")
+        )
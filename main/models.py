@@ -1,18 +1,303 @@
+import operator
+from collections import Counter, defaultdict
+from datetime import timedelta
+from functools import reduce
+
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+
+def build_search_query(search_term):
+    # websearch syntax: plain words, "quoted phrases", OR and -excluded words
+    return SearchQuery(search_term, search_type="websearch")
+
+
+def build_contains_filter(fields, search_term):
+    # case-insensitive substring match on any of `fields`
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__icontains": search_term})
+
+    return condition
+
+
+def build_search_rank(search_term):
+    # ts_rank returns a float4, cast it so the value round-trips through cursors
+    return Cast(
+        SearchRank(F("search_vector"), build_search_query(search_term)),
+        output_field=models.FloatField(),
+    )
+
+
+def build_search_vector(weights, values=None):
+    """
+    weighted tsvector over the `weights` fields
+    fields present in `values` use those (new) values instead of the column, so
+    the vector can be written in the same INSERT / UPDATE as the fields themselves
+    """
+    values = values or {}
+    vectors = [
+        SearchVector(Value(values[field]) if field in values else field, weight=weight)
+        for field, weight in weights.items()
+    ]
+    return reduce(operator.add, vectors)
+
+
+def get_week_end(now):
+    # midnight starting next Monday, in the current time zone
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today + timedelta(days=7 - today.weekday())
+
+
+class SearchVectorMixin:
+    """
+    KEEPS THE STORED search_vector COLUMN IN SYNC WITH THE SEARCH_WEIGHTS FIELDS
+    """
+
+    SEARCH_WEIGHTS = {}
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or self.SEARCH_WEIGHTS.keys() & set(update_fields):
+            self.set_search_vector()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_vector"}
+
+        super().save(*args, **kwargs)
+        self.clear_search_vector()
+
+    def set_search_vector(self):
+        values = {field: getattr(self, field) for field in self.SEARCH_WEIGHTS}
+        self.search_vector = build_search_vector(self.SEARCH_WEIGHTS, values)
+
+    def clear_search_vector(self):
+        # the column now holds the vector, drop the expression from the instance
+        self.__dict__.pop("search_vector", None)
+
+    @classmethod
+    def create_many(cls, instances, batch_size=1000):
+        """
+        THIS METHOD INSERTS INSTANCES WITH bulk_create
+        Arguments:
+            instances {list} -- unsaved model instances
+        """
+        instances = cls.objects.bulk_create(instances, batch_size=batch_size)
+
+        # one UPDATE fills the vectors from the stored columns; compiling a
+        # SearchVector expression per row into the INSERT costs more than that
+        ids = [instance.id for instance in instances]
+        for start in range(0, len(ids), batch_size):
+            cls.update_search_vector(id__in=ids[start : start + batch_size])
+
+        return instances
+
+    @classmethod
+    def update_search_vector(cls, **filters):
+        """
+        THIS METHOD RECOMPUTES THE STORED search_vector OF THE MATCHING ROWS
+        """
+        return cls.objects.filter(**filters).update(
+            search_vector=build_search_vector(cls.SEARCH_WEIGHTS)
+        )
+
+
+class ProjectQuerySet(models.QuerySet):
+    def for_user(self, user_id):
+        return self.not_deleted().filter(user_id=user_id)
+
+    def not_deleted(self):
+        """
+        THIS METHOD HIDES PROJECTS DELETED BUT NOT PURGED YET (see main/purge.py)
+        """
+        return self.filter(deleted_at__isnull=True)
+
+    def created_between(self, start_date, end_date):
+        return self.filter(created_at__range=[start_date, end_date])
+
+    def search(self, search_term, mode="contains"):
+        """
+        THIS METHOD FILTERS ON search_term
+        Arguments:
+            mode {str} -- "contains" (substring of the SEARCH_WEIGHTS fields) or
+                "fulltext" (websearch syntax on search_vector, stemmed)
+        """
+        if mode == "fulltext":
+            return self.filter(search_vector=build_search_query(search_term))
+
+        return self.filter(
+            build_contains_filter(self.model.SEARCH_WEIGHTS, search_term)
+        )
+
+    def with_related(self):
+        """
+        THIS METHOD LOADS EACH PROJECT'S USER IN THE SAME QUERY
+        and skips the search column, which is never serialized
+        """
+        return self.select_related("user").defer("search_vector")
+
+    def with_task_stats(self, now):
+        """
+        THIS METHOD ANNOTATES EACH PROJECT WITH ITS TASK COUNTS
+        total, status_<status> per STATUS_OPTIONS, overdue (due before `now`)
+        and due_this_week (due from `now` until the end of the week), the last
+        two only counting tasks that are not COMPLETED.
+        One LEFT JOIN + GROUP BY, projects without tasks get zeros.
+        """
+        open_tasks = ~Q(tasks__status="COMPLETED")
+        week_end = get_week_end(now)
+
+        stats = {"total": Count("tasks")}
+        for option, _ in Task.STATUS_OPTIONS:
+            stats[f"status_{option.lower()}"] = Count(
+                "tasks", filter=Q(tasks__status=option)
+            )
+        stats["overdue"] = Count(
+            "tasks", filter=open_tasks & Q(tasks__due_date__lt=now)
+        )
+        stats["due_this_week"] = Count(
+            "tasks",
+            filter=open_tasks
+            & Q(tasks__due_date__gte=now, tasks__due_date__lt=week_end),
+        )
+
+        return self.annotate(**stats)
 
 
 # Create your models here.
-class Project(models.Model):
+class Project(SearchVectorMixin, models.Model):
+    # the (user, ...) composite indexes below also serve user_id lookups
     user = models.ForeignKey(
-        get_user_model(), on_delete=models.CASCADE, related_name="projects"
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="projects",
+        db_index=False,
     )
     name = models.CharField(max_length=300)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # kept in sync by SearchVectorMixin
+    search_vector = SearchVectorField(null=True, editable=False)
+    # task counters, kept in sync by Task through update_task_counters() and
+    # recomputed by `python manage.py repair_task_counters`
+    task_count = models.IntegerField(default=0, editable=False)
+    to_do_count = models.IntegerField(default=0, editable=False)
+    in_progress_count = models.IntegerField(default=0, editable=False)
+    completed_count = models.IntegerField(default=0, editable=False)
+    last_activity_at = models.DateTimeField(null=True, editable=False)
+    # set by mark_deleted(), the row and its tasks are then purged in batches
+    deleted_at = models.DateTimeField(null=True, editable=False)
+
+    SEARCH_WEIGHTS = {"name": "A", "description": "B"}
+
+    # task status -> counter column
+    STATUS_COUNTERS = {
+        "TO_DO": "to_do_count",
+        "IN_PROGRESS": "in_progress_count",
+        "COMPLETED": "completed_count",
+    }
+    COUNTER_FIELDS = ("task_count", *STATUS_COUNTERS.values(), "last_activity_at")
+    # never written by a save() without update_fields, see save()
+    PROTECTED_FIELDS = (*COUNTER_FIELDS, "deleted_at")
+
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # filter_by_created_date
+            models.Index(
+                fields=["user", "created_at"], name="project_user_created_idx"
+            ),
+            # user__id filter + sort_data ordering by id
+            models.Index(fields=["user", "id"], name="project_user_id_idx"),
+            # search_mode=fulltext
+            GinIndex(fields=["search_vector"], name="project_search_idx"),
+            # pending purges
+            models.Index(
+                fields=["deleted_at"],
+                condition=Q(deleted_at__isnull=False),
+                name="project_deleted_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the counters are only written with F() updates and deleted_at by
+        # mark_deleted(), a full save of a possibly stale instance must not
+        # overwrite them (e.g. undelete a project waiting to be purged)
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred_fields = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.PROTECTED_FIELDS
+                and field.attname not in deferred_fields
+            ]
+
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def update_task_counters(cls, changes):
+        """
+        THIS METHOD APPLIES TASK COUNT CHANGES TO THE PROJECT COUNTERS
+        one UPDATE per project in id order, also setting last_activity_at
+        Arguments:
+            changes {dict} -- project id -> Counter of "total" / status deltas
+        """
+        now = timezone.now()
+
+        # a fixed lock order, so concurrent writes to the same projects cannot
+        # deadlock
+        for project_id, deltas in sorted(changes.items()):
+            updates = {"last_activity_at": now}
+            for column, delta in cls.get_counter_deltas(deltas).items():
+                updates[column] = F(column) + delta
+
+            cls.objects.filter(id=project_id).update(**updates)
+
+        return now
+
+    @classmethod
+    def get_counter_deltas(cls, deltas):
+        # "total" / status deltas -> counter column deltas
+        columns = {"total": "task_count", **cls.STATUS_COUNTERS}
+        return {
+            columns[key]: delta
+            for key, delta in deltas.items()
+            if key in columns and delta
+        }
+
+    def apply_task_counters(self, deltas, last_activity_at):
+        """
+        THIS METHOD MIRRORS update_task_counters() ON A LOADED PROJECT
+        so a task's nested project can be serialized without re-reading it
+        """
+        for column, delta in self.get_counter_deltas(deltas).items():
+            setattr(self, column, getattr(self, column) + delta)
+
+        self.last_activity_at = last_activity_at
+
+    def mark_deleted(self):
+        """
+        THIS METHOD DELETES THE PROJECT WITHOUT TOUCHING ITS TASKS
+        the project is deactivated and hidden from every query scoped with
+        for_user() / not_deleted(); main.purge.purge_project() removes the
+        tasks in batches and then the row itself
+        """
+        self.is_active = False
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["is_active", "deleted_at", "updated_at"])
 
     @classmethod
     def create(cls, **kwargs):
@@ -26,34 +311,121 @@ class Project(models.Model):
 
     @classmethod
     def filter_by_created_date(cls, start_date, end_date, user_id):
-        return cls.objects.filter(
-            created_at__range=[start_date, end_date], user__id=user_id
-        )
+        return cls.objects.for_user(user_id).created_between(start_date, end_date)
 
     @classmethod
-    def search_project(cls, search_term, user_id):
-        return cls.objects.filter(
-            Q(user__id=user_id)
-            & (Q(name__icontains=search_term) | Q(description__icontains=search_term))
-        )
+    def search_project(cls, search_term, user_id, mode="contains"):
+        return cls.objects.for_user(user_id).search(search_term, mode=mode)
 
     @classmethod
-    def sort_data(cls, queryset, sort_by):
+    def sort_data(cls, queryset, sort_by, search_term=None):
         if sort_by == "asc":
             return queryset.order_by("id")
         elif sort_by == "desc":
             return queryset.order_by("-id")
+        elif sort_by == "relevance":
+            return queryset.annotate(rank=build_search_rank(search_term)).order_by(
+                "-rank", "-id"
+            )
 
         return queryset
 
 
-class Task(models.Model):
+def count_task_changes(rows):
+    """
+    THIS METHOD GROUPS TASK COUNT CHANGES BY PROJECT FOR update_task_counters()
+    Arguments:
+        rows {iterable} -- (project id, status, delta) tuples, a delta of 0
+            only marks the project as active
+    """
+    changes = defaultdict(Counter)
+    for project_id, status, delta in rows:
+        changes[project_id]["total"] += delta
+        changes[project_id][status] += delta
+
+    return changes
+
+
+# saving any of these fields can move a task between project counters
+COUNTED_TASK_FIELDS = {"project", "project_id", "status"}
+
+
+class TaskQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        THIS METHOD DELETES THE TASKS AND DECREMENTS THEIR PROJECT COUNTERS
+        """
+        with transaction.atomic(savepoint=False):
+            rows = (
+                self.order_by()
+                .values_list("project_id", "status")
+                .annotate(count=Count("id"))
+            )
+            changes = count_task_changes(
+                (project_id, status, -count) for project_id, status, count in rows
+            )
+
+            result = super().delete()
+            Project.update_task_counters(changes)
+
+        return result
+
+    def for_user(self, user_id):
+        """
+        THIS METHOD SCOPES TASKS TO THE PROJECTS OWNED BY A USER
+        joins on project.user_id instead of an IN (...) over the user's project ids
+        """
+        return self.not_deleted().filter(project__user_id=user_id)
+
+    def not_deleted(self):
+        """
+        THIS METHOD HIDES TASKS OF DELETED PROJECTS WAITING TO BE PURGED
+        """
+        return self.filter(project__deleted_at__isnull=True)
+
+    def created_between(self, start_date, end_date):
+        return self.filter(created_at__range=[start_date, end_date])
+
+    def due_between(self, start_date, end_date):
+        return self.filter(due_date__range=[start_date, end_date])
+
+    def with_status(self, status):
+        return self.filter(status=str(status).upper())
+
+    def search(self, search_term, mode="contains"):
+        """
+        THIS METHOD FILTERS ON search_term
+        Arguments:
+            mode {str} -- "contains" (substring of the SEARCH_WEIGHTS fields) or
+                "fulltext" (websearch syntax on search_vector, stemmed)
+        """
+        if mode == "fulltext":
+            return self.filter(search_vector=build_search_query(search_term))
+
+        return self.filter(
+            build_contains_filter(self.model.SEARCH_WEIGHTS, search_term)
+        )
+
+    def with_related(self):
+        """
+        THIS METHOD LOADS EACH TASK'S PROJECT AND ITS USER IN THE SAME QUERY
+        and skips the search columns, which are never serialized
+        """
+        return self.select_related("project__user").defer(
+            "search_vector", "project__search_vector"
+        )
+
+
+class Task(SearchVectorMixin, models.Model):
     STATUS_OPTIONS = (
         ("TO_DO", "TO_DO"),
         ("IN_PROGRESS", "IN_PROGRESS"),
         ("COMPLETED", "COMPLETED"),
     )
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="tasks")
+    # the (project, ...) composite indexes below also serve project_id lookups
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="tasks", db_index=False
+    )
     title = models.CharField(max_length=50)
     description = models.CharField(max_length=100)
     due_date = models.DateTimeField()
@@ -62,6 +434,96 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # kept in sync by SearchVectorMixin, update() and the bulk helpers
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    SEARCH_WEIGHTS = {"title": "A", "description": "B"}
+    # the fields a PUT / PATCH on a task writes
+    EDITABLE_FIELDS = ("title", "description", "due_date", "priority_level", "status")
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # filter_by_created_date
+            models.Index(
+                fields=["project", "created_at"], name="task_project_created_idx"
+            ),
+            # filter_by_due_date
+            models.Index(fields=["project", "due_date"], name="task_project_due_idx"),
+            # filter_by_status
+            models.Index(fields=["project", "status"], name="task_project_status_idx"),
+            # for_user() + sort_data ordering by id
+            models.Index(fields=["project", "id"], name="task_project_id_idx"),
+            # scan_due_tasks, only the tasks that can still get a reminder
+            models.Index(
+                fields=["due_date", "id"],
+                condition=Q(is_active=True) & ~Q(status="COMPLETED"),
+                name="task_open_due_idx",
+            ),
+            # scan_due_tasks, open tasks changed since the last scan
+            models.Index(
+                fields=["updated_at"],
+                condition=Q(is_active=True) & ~Q(status="COMPLETED"),
+                name="task_open_updated_idx",
+            ),
+            # search_mode=fulltext
+            GinIndex(fields=["search_vector"], name="task_search_idx"),
+        ]
+
+    def get_counted_as(self):
+        """
+        THIS METHOD LOCKS THE STORED ROW AND RETURNS THE (project_id, status)
+        IT IS COUNTED IN, None IF THERE IS NO ROW
+        read from the database rather than the instance, which may be stale
+        """
+        return (
+            Task.objects.select_for_update()
+            .filter(id=self.id)
+            .values_list("project_id", "status")
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+
+        # only inserting or writing project / status touches the project row
+        if not (
+            self._state.adding
+            or update_fields is None
+            or COUNTED_TASK_FIELDS & set(update_fields)
+        ):
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic(savepoint=False):
+            rows = [(self.project_id, self.status, 1)]
+            if not self._state.adding:
+                # counters move from the stored values to the new ones
+                counted_as = self.get_counted_as()
+                if counted_as is not None:
+                    rows = [(*counted_as, -1), *rows]
+                elif update_fields is not None:
+                    # no row, the UPDATE fails
+                    rows = []
+
+            changes = count_task_changes(rows)
+            super().save(*args, **kwargs)
+            last_activity_at = Project.update_task_counters(changes)
+
+        if Task.project.is_cached(self) and self.project_id in changes:
+            self.project.apply_task_counters(
+                changes[self.project_id], last_activity_at
+            )
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            counted_as = self.get_counted_as()
+            result = super().delete(*args, **kwargs)
+            if counted_as is not None:
+                Project.update_task_counters(count_task_changes([(*counted_as, -1)]))
+
+        return result
 
     @classmethod
     def create(cls, **kwargs):
@@ -69,40 +531,240 @@ class Task(models.Model):
         return task
 
     @classmethod
-    def filter_by_created_date(cls, start_date, end_date, project_ids):
-        return cls.objects.filter(
-            created_at__range=[start_date, end_date], project__id__in=project_ids
-        )
+    def filter_by_created_date(cls, start_date, end_date, user_id):
+        return cls.objects.for_user(user_id).created_between(start_date, end_date)
 
     @classmethod
-    def filter_by_due_date(cls, start_date, end_date, project_ids):
-        return cls.objects.filter(
-            due_date__range=[start_date, end_date], project__id__in=project_ids
-        )
+    def filter_by_due_date(cls, start_date, end_date, user_id):
+        return cls.objects.for_user(user_id).due_between(start_date, end_date)
 
     @classmethod
-    def filter_by_status(cls, status, project_ids):
-        return cls.objects.filter(
-            status=str(status).upper(), project__id__in=project_ids
-        )
+    def filter_by_status(cls, status, user_id):
+        return cls.objects.for_user(user_id).with_status(status)
 
     @classmethod
-    def search_task(cls, search_term, project_ids):
-        return cls.objects.filter(
-            Q(project__id__in=project_ids)
-            & (Q(title__icontains=search_term) | Q(description__icontains=search_term))
-        )
+    def search_task(cls, search_term, user_id, mode="contains"):
+        return cls.objects.for_user(user_id).search(search_term, mode=mode)
 
     @classmethod
-    def sort_data(cls, queryset, sort_by):
+    def sort_data(cls, queryset, sort_by, search_term=None):
         if sort_by == "asc":
             return queryset.order_by("id")
         elif sort_by == "desc":
             return queryset.order_by("-id")
+        elif sort_by == "relevance":
+            return queryset.annotate(rank=build_search_rank(search_term)).order_by(
+                "-rank", "-id"
+            )
 
         return queryset
 
+    @classmethod
+    def create_many(cls, tasks, batch_size=1000):
+        """
+        THIS METHOD INSERTS TASKS WITH bulk_create AND INCREMENTS THE COUNTERS
+        """
+        with transaction.atomic(savepoint=False):
+            tasks = super().create_many(tasks, batch_size=batch_size)
+            Project.update_task_counters(
+                count_task_changes((task.project_id, task.status, 1) for task in tasks)
+            )
+
+        return tasks
+
+    @classmethod
+    def update_many(cls, tasks, fields, batch_size=1000):
+        """
+        THIS METHOD SAVES `fields` OF TASKS WITH bulk_update
+        bulk_update skips auto_now, so updated_at is set here
+        """
+        fields = [*fields, "updated_at"]
+        update_search_vector = bool(cls.SEARCH_WEIGHTS.keys() & set(fields))
+        if update_search_vector:
+            fields.append("search_vector")
+
+        updated_at = timezone.now()
+        for task in tasks:
+            task.updated_at = updated_at
+            if update_search_vector:
+                task.set_search_vector()
+
+        # the same task may be passed twice, count it once; rows are written
+        # in id order like they are locked
+        unique_tasks = sorted(
+            {task.id: task for task in tasks}.values(), key=lambda task: task.id
+        )
+
+        with transaction.atomic(savepoint=False):
+            if COUNTED_TASK_FIELDS & set(fields):
+                # counters move from the stored values to the new ones
+                previous = (
+                    cls.objects.select_for_update()
+                    .filter(id__in=[task.id for task in unique_tasks])
+                    .order_by("id")
+                    .values_list("project_id", "status")
+                )
+                rows = [(project_id, status, -1) for project_id, status in previous]
+                rows += [(task.project_id, task.status, 1) for task in unique_tasks]
+            else:
+                rows = []
+
+            cls.objects.bulk_update(unique_tasks, fields, batch_size=batch_size)
+            if rows:
+                Project.update_task_counters(count_task_changes(rows))
+
+        for task in tasks:
+            task.clear_search_vector()
+
+        return tasks
+
+    def save_changes(self, **kwargs):
+        """
+        THIS METHOD UPDATES A LOADED TASK WITH A SINGLE UPDATE STATEMENT
+        (plus locking the row and updating the project counters when project
+        or status are written) values are cleaned by the model
+        fields, so the instance can be serialized as-is without re-reading
+        the row
+        Keyword Arguments:
+            **kwargs {dict} -- task data
+        """
+        for field_name, value in kwargs.items():
+            setattr(self, field_name, self._meta.get_field(field_name).to_python(value))
+
+        # updated_at is included so auto_now is applied
+        self.save(update_fields=[*kwargs, "updated_at"])
+        return self
+
     @classmethod
     def update(cls, task_id, **kwargs):
-        task = cls.objects.filter(id=task_id).update(**kwargs)
+        # a queryset update skips auto_now
+        kwargs.setdefault("updated_at", timezone.now())
+        if cls.SEARCH_WEIGHTS.keys() & set(kwargs):
+            kwargs["search_vector"] = build_search_vector(cls.SEARCH_WEIGHTS, kwargs)
+
+        with transaction.atomic(savepoint=False):
+            # lock the row so the counters move from the values being replaced
+            previous = (
+                cls.objects.select_for_update()
+                .filter(id=task_id)
+                .values_list("project_id", "status")
+                .first()
+            )
+
+            task = cls.objects.filter(id=task_id).update(**kwargs)
+
+            if previous is not None:
+                project_id, status = previous
+                if "project" in kwargs:
+                    new_project_id = kwargs["project"].id
+                else:
+                    new_project_id = kwargs.get("project_id", project_id)
+                new_status = kwargs.get("status", status)
+
+                rows = [(project_id, status, -1), (new_project_id, new_status, 1)]
+                Project.update_task_counters(count_task_changes(rows))
+
         return task
+
+
+class Job(models.Model):
+    """
+    A UNIT OF BACKGROUND WORK
+    enqueued with main.jobs.enqueue() and run by `python manage.py runworker`
+    """
+
+    STATUS_OPTIONS = (
+        ("QUEUED", "QUEUED"),
+        ("RUNNING", "RUNNING"),
+        ("SUCCEEDED", "SUCCEEDED"),
+        ("FAILED", "FAILED"),
+    )
+    # the user who may poll the job, None for system jobs
+    user = models.ForeignKey(
+        get_user_model(), null=True, on_delete=models.CASCADE, related_name="jobs"
+    )
+    # key of main.jobs.JOB_HANDLERS
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_OPTIONS, default="QUEUED")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    # not claimed before this time, pushed back on every retry
+    run_at = models.DateTimeField(default=timezone.now)
+    # set while RUNNING and refreshed by report_progress()
+    locked_at = models.DateTimeField(null=True)
+    progress = models.JSONField(null=True)
+    result = models.JSONField(null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            # claim_job()
+            models.Index(
+                fields=["run_at", "id"],
+                condition=Q(status="QUEUED"),
+                name="job_queued_idx",
+            ),
+            # requeue_stale_jobs()
+            models.Index(
+                fields=["locked_at"],
+                condition=Q(status="RUNNING"),
+                name="job_running_idx",
+            ),
+        ]
+
+    def report_progress(self, **progress):
+        """
+        THIS METHOD STORES THE PROGRESS OF A RUNNING JOB FOR POLLING CLIENTS
+        it also refreshes locked_at, so a long job is not taken for a job
+        whose worker died. Nothing is written once the job was claimed again.
+        """
+        self.progress = progress
+        self.locked_at = timezone.now()
+        Job.objects.filter(id=self.id, status="RUNNING", attempts=self.attempts).update(
+            progress=progress, locked_at=self.locked_at
+        )
+
+
+class Reminder(models.Model):
+    """
+    ONE USER'S TASKS THAT CROSSED A DUE-DATE THRESHOLD IN ONE SCAN
+    created by `python manage.py scan_due_tasks` (main/reminders.py)
+    """
+
+    KIND_OPTIONS = (
+        ("OVERDUE", "OVERDUE"),
+        ("DUE_SOON", "DUE_SOON"),
+    )
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="reminders"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_OPTIONS)
+    # ids rather than a foreign key, a relation to Task would disable its
+    # fast (single statement) delete
+    task_ids = models.JSONField(default=list)
+    task_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="reminder_user_idx"),
+        ]
+
+
+class ReminderWatermark(models.Model):
+    """
+    THE DUE DATE EACH REMINDER KIND HAS BEEN SCANNED UP TO
+    the next scan only looks at tasks due after it, or changed since the last
+    scan
+    """
+
+    kind = models.CharField(max_length=20, unique=True)
+    # None until the first scan, which covers every task due before it
+    scanned_until = models.DateTimeField(null=True)
+    # start of the last scan, tasks changed after it are looked at again
+    scanned_at = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
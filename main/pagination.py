@@ -0,0 +1,199 @@
+import base64
+import json
+import math
+from collections import OrderedDict
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPagination(BasePagination):
+    """
+    CURSOR (KEYSET) PAGINATION
+
+    Seeks past the last row seen using the ordering columns instead of
+    running COUNT(*) + OFFSET, so deep pages cost the same as the first one.
+    The cursor is an opaque token holding the ordering values of the
+    boundary row, e.g. (id,) or (created_at, id).
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 10
+    max_page_size = 100
+
+    def __init__(self, ordering=("id",)):
+        # the last ordering field must be unique (e.g. id) so the seek is stable
+        self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request)
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        async variant of paginate_queryset for the async views
+        """
+        page_queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        self.cursor = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.cursor and self.cursor["r"]:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            try:
+                queryset = queryset.filter(
+                    self._seek_filter(ordering, self.cursor["p"])
+                )
+            except (TypeError, ValueError, OverflowError, ValidationError):
+                raise InvalidCursor("Invalid cursor")
+
+        # fetch one extra row to know if there is another page without COUNT(*)
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        cursor = self.cursor
+        reverse = bool(cursor and cursor["r"])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        position = [self._get_value(row, field) for field in self.ordering]
+        payload = json.dumps(
+            {"p": position, "r": int(reverse)}, cls=DjangoJSONEncoder
+        )
+        token = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            payload = base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8")
+            cursor = json.loads(payload)
+            position = cursor["p"]
+            cursor["r"] = int(cursor.get("r", 0))
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            UnicodeError,
+            AttributeError,
+            OverflowError,
+        ):
+            raise InvalidCursor("Invalid cursor")
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise InvalidCursor("Invalid cursor")
+        if not all(self._is_valid_position_value(value) for value in position):
+            raise InvalidCursor("Invalid cursor")
+
+        return cursor
+
+    @staticmethod
+    def _is_valid_position_value(value):
+        # json.loads accepts Infinity / NaN and arbitrarily large integers,
+        # none of which a bigint / float column can be compared with
+        if isinstance(value, bool):
+            return False
+        if isinstance(value, int):
+            return -(2**63) <= value < 2**63
+        if isinstance(value, float):
+            return math.isfinite(value)
+
+        return isinstance(value, str)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else "-" + field
+
+    @staticmethod
+    def _get_value(row, field):
+        name = field.lstrip("-")
+        if isinstance(row, dict):
+            return row[name]
+
+        return getattr(row, name)
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        # (a, b) > (x, y)  ==>  a > x OR (a = x AND b > y)
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+
+            clause = Q(**{f"{name}__{lookup}": position[index]})
+            for prev_field, prev_value in zip(ordering[:index], position[:index]):
+                clause &= Q(**{prev_field.lstrip("-"): prev_value})
+
+            clauses.append(clause)
+
+        return reduce(lambda left, right: left | right, clauses)
@@ -0,0 +1,117 @@
+import logging
+
+from django.db import transaction
+
+from main.jobs import enqueue
+from main.models import Project
+from main.models import Task as ProjectTask
+
+logger = logging.getLogger(__name__)
+
+# tasks deleted per transaction, keeps every lock short
+PURGE_BATCH_SIZE = 1000
+
+
+def purge_project(project_id, batch_size=PURGE_BATCH_SIZE, on_batch=None):
+    """
+    THIS METHOD PURGES A PROJECT DELETED WITH Project.mark_deleted()
+    its tasks are deleted batch_size at a time, each batch in its own short
+    transaction, then the project row. Safe to run again after an interruption.
+    Every batch first checks the project is still deleted.
+    Arguments:
+        project_id {int} -- the deleted project
+        on_batch {callable} -- called with (project_id, deleted, total) after
+            every batch
+    returns the number of tasks deleted, None if the project is not pending
+    """
+    total = (
+        Project.objects.filter(id=project_id, deleted_at__isnull=False)
+        .values_list("task_count", flat=True)
+        .first()
+    )
+    if total is None:
+        return None
+
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            # locked so the project cannot be written while a batch is deleted
+            if not is_pending_purge(project_id):
+                logger.warning("project %s is no longer deleted", project_id)
+                return None
+
+            ids = list(
+                ProjectTask.objects.filter(project_id=project_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            # Task has no delete signals, this is a single DELETE ... WHERE id IN
+            ProjectTask.objects.filter(id__in=ids).delete()
+
+        deleted += len(ids)
+        logger.info("purging project %s: %s/%s tasks", project_id, deleted, total)
+        if on_batch is not None:
+            on_batch(project_id, deleted, total)
+
+    # no tasks left, the cascade has nothing to collect
+    Project.objects.filter(id=project_id, deleted_at__isnull=False).delete()
+    return deleted
+
+
+def is_pending_purge(project_id):
+    """
+    THIS METHOD LOCKS THE PROJECT ROW AND TELLS IF IT IS STILL MARKED AS DELETED
+    must run in a transaction
+    """
+    return (
+        Project.objects.select_for_update()
+        .filter(id=project_id, deleted_at__isnull=False)
+        .exists()
+    )
+
+
+def get_pending_purges():
+    """
+    THIS METHOD RETURNS THE IDS OF DELETED PROJECTS NOT PURGED YET, OLDEST FIRST
+    """
+    return list(
+        Project.objects.filter(deleted_at__isnull=False)
+        .order_by("deleted_at", "id")
+        .values_list("id", flat=True)
+    )
+
+
+def run_purge_job(job):
+    """
+    THIS METHOD RUNS A "purge_project" JOB, see main/jobs.py
+    """
+    deleted = purge_project(
+        job.payload["project_id"],
+        on_batch=lambda project_id, deleted, total: job.report_progress(
+            deleted=deleted, total=total
+        ),
+    )
+    return {"deleted": deleted}
+
+
+def schedule_purge(project):
+    """
+    THIS METHOD QUEUES THE PURGE OF A DELETED PROJECT FOR THE JOB WORKERS
+    returns the Job, which the project's user can poll
+    """
+    return enqueue(
+        "purge_project", {"project_id": project.id}, user_id=project.user_id
+    )
+
+
+def delete_project(project):
+    """
+    THIS METHOD DELETES A PROJECT FOR THE API
+    hides it at once and queues the purge of its tasks, returns the Job
+    """
+    with transaction.atomic():
+        project.mark_deleted()
+        return schedule_purge(project)
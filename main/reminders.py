@@ -0,0 +1,107 @@
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from main.models import Reminder, ReminderWatermark
+from main.models import Task as ProjectTask
+
+# reminders inserted per statement, also the fetch size of the task cursor
+REMINDER_BATCH_SIZE = 1000
+
+
+def get_open_tasks():
+    """
+    THIS METHOD RETURNS THE TASKS THAT CAN STILL GET A REMINDER
+    active, not COMPLETED and not in a deleted project; the first two match the
+    condition of the task_open_due_idx partial index
+    """
+    return (
+        ProjectTask.objects.not_deleted()
+        .filter(is_active=True)
+        .exclude(status="COMPLETED")
+    )
+
+
+def scan_due_tasks(
+    kind, threshold, first_scan_from=None, batch_size=REMINDER_BATCH_SIZE
+):
+    """
+    THIS METHOD CREATES ONE REMINDER PER USER FOR THE OPEN TASKS WHOSE DUE DATE
+    IS NOW BEFORE `threshold` BUT WAS NOT AT THE LAST SCAN OF THIS KIND
+
+    The due_date window (watermark, threshold] is read through the
+    task_open_due_idx index, and the watermark then moves to threshold. Tasks
+    due in a window already scanned are read again when changed since the last
+    scan (task_open_updated_idx): created already due, rescheduled earlier or
+    reopened. Any other change to such a task, e.g. a new title, also reminds
+    it again. The watermark row is locked for the scan and updated in the same
+    transaction as the reminders, so concurrent or failed runs never remind
+    twice.
+
+    Arguments:
+        kind {str} -- OVERDUE (threshold is now) or DUE_SOON (now + lead time)
+        threshold {datetime} -- tasks due up to this time are reminded
+        first_scan_from {datetime} -- lower bound of the first scan, which
+            otherwise covers every task due before threshold, and of the
+            changed tasks
+    returns (reminders created, tasks reminded)
+    """
+    ReminderWatermark.objects.get_or_create(kind=kind)
+
+    with transaction.atomic():
+        watermark = ReminderWatermark.objects.select_for_update().get(kind=kind)
+        scanned_at = timezone.now()
+
+        tasks = get_open_tasks().filter(due_date__lte=threshold)
+
+        scanned_until = watermark.scanned_until or first_scan_from
+        if scanned_until is not None:
+            # crossed the threshold since the last scan
+            due = Q(due_date__gt=scanned_until)
+
+            if watermark.scanned_at is not None:
+                changed = Q(updated_at__gt=watermark.scanned_at)
+                if first_scan_from is not None:
+                    changed &= Q(due_date__gt=first_scan_from)
+                due |= changed
+
+            tasks = tasks.filter(due)
+
+        rows = (
+            tasks.order_by("project__user_id", "due_date", "id")
+            .values_list("project__user_id", "id")
+            .iterator(chunk_size=batch_size)
+        )
+
+        reminders = []
+        reminder_count = 0
+        task_count = 0
+        for user_id, user_rows in groupby(rows, key=itemgetter(0)):
+            task_ids = [task_id for _, task_id in user_rows]
+            reminders.append(
+                Reminder(
+                    user_id=user_id,
+                    kind=kind,
+                    task_ids=task_ids,
+                    task_count=len(task_ids),
+                )
+            )
+            task_count += len(task_ids)
+
+            if len(reminders) >= batch_size:
+                Reminder.objects.bulk_create(reminders)
+                reminder_count += len(reminders)
+                reminders = []
+
+        if reminders:
+            Reminder.objects.bulk_create(reminders)
+            reminder_count += len(reminders)
+
+        watermark.scanned_until = max(threshold, scanned_until or threshold)
+        watermark.scanned_at = scanned_at
+        watermark.save(update_fields=["scanned_until", "scanned_at", "updated_at"])
+
+    return reminder_count, task_count
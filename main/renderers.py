@@ -0,0 +1,43 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# orjson writes compact UTF-8 like JSONRenderer with COMPACT_JSON / UNICODE_JSON;
+# datetimes go through the DRF encoder, which writes UTC as "Z"
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer ON orjson
+    writes the same bytes as JSONRenderer for the same data at a fraction of
+    the CPU. Indented output (e.g. the browsable API) and anything orjson
+    cannot encode are left to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers over 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # JSONRenderer escapes these so the output is a strict javascript subset
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+
+        return ret
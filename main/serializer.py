@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework import serializers
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
-from main.models import Project
+from main.models import Job, Project
 from main.models import Task as ProjectTask
 
 
@@ -54,7 +57,8 @@ class ProjectModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Project
-        fields = "__all__"
+        # deleted projects are never served, deleted_at is internal
+        exclude = ["search_vector", "deleted_at"]
 
     def to_representation(self, instance):
         data = super(ProjectModelSerializer, self).to_representation(instance)
@@ -79,13 +83,40 @@ class TaskSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=STATUS_OPTIONS)
 
 
+class TaskUpdateSerializer(TaskSerializer):
+    id = serializers.IntegerField()
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    MAX_OPERATIONS = 5000
+
+    create = TaskSerializer(many=True, required=False)
+    update = TaskUpdateSerializer(many=True, required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        operations = sum(
+            len(attrs.get(key, [])) for key in ("create", "update", "delete")
+        )
+
+        if operations == 0:
+            raise serializers.ValidationError("No operations provided")
+
+        if operations > self.MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"A request can contain at most {self.MAX_OPERATIONS} operations"
+            )
+
+        return attrs
+
+
 class TaskModelSerializer(serializers.ModelSerializer):
     project = ProjectModelSerializer()
     due_date = CustomDateField()
 
     class Meta:
         model = ProjectTask
-        fields = "__all__"
+        exclude = ["search_vector"]
         depth = 1
 
     def to_representation(self, instance):
@@ -94,3 +125,250 @@ class TaskModelSerializer(serializers.ModelSerializer):
 
         data["project"] = project
         return data
+
+
+class JobModelSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "attempts",
+            "max_attempts",
+            "progress",
+            "result",
+            "error",
+            "run_at",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+
+
+# lean read path of the list endpoints: pages are read with values() and
+# turned into the model serializers' output directly, skipping DRF's per-field
+# machinery; LeanSerializerTestCase checks the output stays identical
+DATETIME_FIELD = serializers.DateTimeField()
+DATE_FIELD = CustomDateField()
+
+
+def get_datetime_converter():
+    """
+    THIS METHOD RETURNS DateTimeField.to_representation WITH THE CURRENT TIME
+    ZONE LOOKED UP ONCE
+    the lookup costs more than the rest of the conversion, per value
+    """
+    if not settings.USE_TZ or api_settings.DATETIME_FORMAT != ISO_8601:
+        return DATETIME_FIELD.to_representation
+
+    current_timezone = timezone.get_current_timezone()
+
+    def to_representation(value):
+        if not value:
+            return None
+
+        value = value.astimezone(current_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return to_representation
+
+
+class LeanSerializer:
+    """
+    BUILDS A MODEL SERIALIZER'S OUTPUT FROM values() ROWS
+
+    fields are output keys and lookups alike, in the model serializer's order;
+    nested serializers read their fields from the same row through prefixed
+    lookups (e.g. project__user__username) and come last, as the model
+    serializers' to_representation() put them.
+
+    fields / expand give a sparse fieldset: only the listed keys are written,
+    and a nested key not expanded is written as the related id. Only the
+    columns (and joins) needed for that are selected.
+
+    usage:
+        serializer = LeanTaskSerializer.from_params(request.GET)
+        rows = serializer.get_rows(queryset)
+        data = serializer.to_representation_many(rows)
+    """
+
+    fields = ()
+    datetime_fields = set()
+    date_fields = set()
+    # (key, LeanSerializer subclass)
+    nested = ()
+
+    def __init__(self, prefix="", fields=None, expand=None):
+        """
+        Keyword Arguments:
+            fields {set} -- output keys to write, None for all
+            expand {set} -- nested keys written as objects, dotted for deeper
+                levels (e.g. project.user); None expands all of them
+        """
+        self.items = [
+            (field, f"{prefix}{field}", self.get_field_type(field))
+            for field in self.fields
+            if fields is None or field in fields
+        ]
+        self.nested_items = []
+
+        for key, serializer_class in self.nested:
+            if fields is not None and key not in fields:
+                continue
+
+            if expand is None:
+                nested_expand = None
+            elif key in expand or any(name.startswith(f"{key}.") for name in expand):
+                nested_expand = {
+                    name.split(".", 1)[1]
+                    for name in expand
+                    if name.startswith(f"{key}.")
+                }
+            else:
+                # the foreign key column, e.g. "project": 1
+                self.items.append((key, f"{prefix}{key}", None))
+                continue
+
+            self.nested_items.append(
+                (
+                    key,
+                    serializer_class(prefix=f"{prefix}{key}__", expand=nested_expand),
+                )
+            )
+
+    @classmethod
+    def get_field_names(cls):
+        return [*cls.fields, *(key for key, _ in cls.nested)]
+
+    @classmethod
+    def get_expand_names(cls):
+        names = []
+        for key, serializer_class in cls.nested:
+            names.append(key)
+            names.extend(
+                f"{key}.{name}" for name in serializer_class.get_expand_names()
+            )
+
+        return names
+
+    @classmethod
+    def from_params(cls, params):
+        """
+        THIS METHOD BUILDS THE SERIALIZER OF THE fields= / expand= QUERY PARAMS
+        comma separated, e.g. ?fields=id,title,project&expand=project; with
+        neither param every key is written and expanded as before, with either
+        one only the expand= keys are expanded. Raises ValueError on unknown
+        names.
+        """
+        fields = cls.parse_names(params.get("fields"), cls.get_field_names(), "fields")
+        expand = cls.parse_names(params.get("expand"), cls.get_expand_names(), "expand")
+
+        if fields is None and expand is None:
+            return cls()
+
+        return cls(fields=fields, expand=expand or set())
+
+    @staticmethod
+    def parse_names(value, options, param):
+        if value is None:
+            return None
+
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        if not names <= set(options):
+            raise ValueError(f"Invalid {param} option")
+
+        return names
+
+    def get_field_type(self, field):
+        if field in self.datetime_fields:
+            return "datetime"
+        if field in self.date_fields:
+            return "date"
+        return None
+
+    def get_lookups(self):
+        lookups = [lookup for _, lookup, _ in self.items]
+        for _, serializer in self.nested_items:
+            lookups.extend(serializer.get_lookups())
+
+        return lookups
+
+    def get_rows(self, queryset):
+        # id and the annotations (e.g. the relevance rank) are always read,
+        # the keyset cursor is built from them
+        lookups = dict.fromkeys(
+            [*self.get_lookups(), "id", *queryset.query.annotations]
+        )
+        return queryset.values(*lookups)
+
+    @staticmethod
+    def get_converters():
+        # field type -> function writing the value like the model serializer
+        return {
+            "datetime": get_datetime_converter(),
+            "date": DATE_FIELD.to_representation,
+        }
+
+    def to_representation(self, row, converters=None):
+        converters = converters or self.get_converters()
+
+        data = {}
+        for field, lookup, field_type in self.items:
+            value = row[lookup]
+            if field_type is not None:
+                value = converters[field_type](value)
+            data[field] = value
+
+        for key, serializer in self.nested_items:
+            data[key] = serializer.to_representation(row, converters)
+
+        return data
+
+    def to_representation_many(self, rows):
+        converters = self.get_converters()
+        return [self.to_representation(row, converters) for row in rows]
+
+
+class LeanUserSerializer(LeanSerializer):
+    # UserSerializer
+    fields = ("username", "email")
+
+
+class LeanProjectSerializer(LeanSerializer):
+    # ProjectModelSerializer
+    fields = (
+        "id",
+        "name",
+        "description",
+        "created_at",
+        "updated_at",
+        "is_active",
+        "task_count",
+        "to_do_count",
+        "in_progress_count",
+        "completed_count",
+        "last_activity_at",
+    )
+    datetime_fields = {"created_at", "updated_at", "last_activity_at"}
+    nested = (("user", LeanUserSerializer),)
+
+
+class LeanTaskSerializer(LeanSerializer):
+    # TaskModelSerializer
+    fields = (
+        "id",
+        "due_date",
+        "title",
+        "description",
+        "priority_level",
+        "status",
+        "created_at",
+        "updated_at",
+        "is_active",
+    )
+    datetime_fields = {"created_at", "updated_at"}
+    date_fields = {"due_date"}
+    nested = (("project", LeanProjectSerializer),)
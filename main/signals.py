@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from main.cache import bump_list_version
+from main.models import Project
+from main.models import Task as ProjectTask
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_lists(sender, instance, **kwargs):
+    bump_list_version(instance.user_id)
+
+
+# Task deliberately has no post_delete receiver: any delete listener disables
+# Django's fast (single statement) delete for tasks, including the cascade from
+# Project.delete(). Code that deletes tasks calls bump_list_version() itself.
+@receiver(post_save, sender=ProjectTask)
+def invalidate_task_lists(sender, instance, **kwargs):
+    bump_list_version(instance.project.user_id)
+
+
+USER_EMAIL_INDEX = "main_user_email_uniq"
+
+
+@receiver(post_migrate)
+def create_user_email_index(sender, using, **kwargs):
+    """
+    THIS RECEIVER ADDS A UNIQUE INDEX ON THE USER EMAIL
+    the user table belongs to django.contrib.auth, so the index cannot be
+    declared on the model. Blank emails (e.g. createsuperuser) are left out.
+    CreateAccountApiView relies on it to reject duplicate emails on insert.
+    """
+    if sender.name != "main":
+        return
+
+    connection = connections[using]
+    table = connection.ops.quote_name(get_user_model()._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {USER_EMAIL_INDEX} "
+            f"ON {table} (email) WHERE email <> ''"
+        )
@@ -1,3 +1,1968 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    APITestCase,
+    APITransactionTestCase,
+)
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from main.async_views import AsyncProjectApiView, AsyncProjectTaskApiView
+from main.importer import Importer, iter_csv_records
+from main.jobs import (
+    JOB_HANDLERS,
+    claim_job,
+    enqueue,
+    requeue_stale_jobs,
+    run_job,
+    work,
+)
+from main.models import Job, Project, Reminder
+from main.models import Task as ProjectTask
+from main.purge import purge_project
+from main.renderers import FastJSONRenderer
+from main.serializer import (
+    LeanProjectSerializer,
+    LeanTaskSerializer,
+    ProjectModelSerializer,
+    TaskBulkSerializer,
+    TaskModelSerializer,
+)
+from main.views import ProjectApiView, ProjectTaskApiView
+
+
+@override_settings(LIST_CACHE_TIMEOUT=0)
+class ListQueryCountTestCase(APITestCase):
+    """
+    THE LIST ENDPOINTS MUST ISSUE THE SAME NUMBER OF QUERIES
+    NO MATTER HOW MANY ROWS ARE ON THE PAGE
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+        for index in range(20):
+            project = Project.create(
+                user=self.user, name=f"project {index}", description="description"
+            )
+            ProjectTask.create(
+                project=project,
+                title=f"task {index}",
+                description="description",
+                due_date=timezone.now() + timedelta(days=index),
+                priority_level="HIGH",
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assert_constant_query_count(self, url):
+        query_counts = {
+            page_size: self.count_queries(
+                f"{url}?pagination=cursor&page_size={page_size}"
+            )
+            for page_size in (1, 5, 20)
+        }
+
+        self.assertEqual(len(set(query_counts.values())), 1, query_counts)
+
+    def test_project_list_query_count(self):
+        self.assert_constant_query_count("/api/project/")
+
+    def test_task_list_query_count(self):
+        self.assert_constant_query_count("/api/task/")
+
+    def test_page_number_query_count(self):
+        # a full page must cost the same as a page with a single row
+        full_page = self.count_queries("/api/task/?sort_by=asc")
+        last_page = self.count_queries("/api/task/?sort_by=asc&page=2")
+
+        ProjectTask.objects.exclude(
+            id=ProjectTask.objects.order_by("id").first().id
+        ).delete()
+        single_row = self.count_queries("/api/task/?sort_by=asc")
+
+        self.assertEqual(full_page, last_page)
+        self.assertEqual(full_page, single_row)
+
+
+@override_settings(LIST_CACHE_TIMEOUT=0)
+class ListFilterTestCase(APITestCase):
+    """
+    THE LIST FILTER PARAMS CHAIN INTO ONE QUERY AND REJECT INVALID VALUES
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.alpha = self.create_project("alpha launch", "2030-01-05")
+        self.beta = self.create_project("beta launch", "2030-02-05")
+        self.gamma = self.create_project("gamma cleanup", "2030-01-10")
+        Project.objects.filter(id=self.gamma.id).update(is_active=False)
+
+        # (project, title, status, created, due)
+        self.tasks = {
+            title: self.create_task(project, title, status, created, due)
+            for project, title, status, created, due in (
+                (self.alpha, "write report", "TO_DO", "2030-01-05", "2030-03-01"),
+                (self.alpha, "review report", "COMPLETED", "2030-01-06", "2030-03-02"),
+                (self.alpha, "write slides", "TO_DO", "2030-02-01", "2030-03-03"),
+                (self.beta, "write notes", "TO_DO", "2030-01-07", "2030-06-01"),
+            )
+        }
+
+        stranger = get_user_model().objects.create_user(
+            username="stranger", email="stranger@example.com", password="stranger"
+        )
+        other = self.create_project("alpha launch", "2030-01-05", user=stranger)
+        self.create_task(other, "write report", "TO_DO", "2030-01-05", "2030-03-01")
+
+    def create_project(self, name, created, user=None):
+        project = Project.create(user=user or self.user, name=name, description="d")
+        Project.objects.filter(id=project.id).update(created_at=self.to_date(created))
+        return project
+
+    def create_task(self, project, title, status, created, due):
+        task = ProjectTask.create(
+            project=project,
+            title=title,
+            description="description",
+            due_date=self.to_date(due),
+            priority_level="LOW",
+            status=status,
+        )
+        ProjectTask.objects.filter(id=task.id).update(created_at=self.to_date(created))
+        return task
+
+    @staticmethod
+    def to_date(value):
+        return timezone.make_aware(datetime.fromisoformat(f"{value}T12:00"))
+
+    def get_ids(self, url):
+        response = self.client.get(f"{url}&sort_by=asc")
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row["id"] for row in response.data["results"]["data"]]
+
+    def test_task_filters_chain(self):
+        tasks = self.tasks
+
+        self.assertEqual(
+            self.get_ids(
+                "/api/task/?created_date_from=2030-01-01&created_date_to=2030-01-31"
+                "&due_date_from=2030-03-01&due_date_to=2030-03-31"
+            ),
+            [tasks["write report"].id, tasks["review report"].id],
+        )
+        self.assertEqual(
+            self.get_ids(
+                "/api/task/?due_date_from=2030-01-01&due_date_to=2030-12-31"
+                "&search=write&status=to_do"
+            ),
+            [
+                tasks["write report"].id,
+                tasks["write slides"].id,
+                tasks["write notes"].id,
+            ],
+        )
+        self.assertEqual(
+            self.get_ids(
+                "/api/task/?created_date_from=2030-01-01&created_date_to=2030-01-31"
+                "&search=report&status=COMPLETED"
+            ),
+            [tasks["review report"].id],
+        )
+
+    def test_project_filters_chain(self):
+        self.assertEqual(
+            self.get_ids(
+                "/api/project/?created_date_from=2030-01-01"
+                "&created_date_to=2030-01-31&is_active=true"
+            ),
+            [self.alpha.id],
+        )
+        self.assertEqual(
+            self.get_ids("/api/project/?search=launch&is_active=1"),
+            [self.alpha.id, self.beta.id],
+        )
+        self.assertEqual(
+            self.get_ids(
+                "/api/project/?created_date_from=2030-01-01"
+                "&created_date_to=2030-01-31&is_active=false"
+            ),
+            [self.gamma.id],
+        )
+
+    def test_invalid_filters(self):
+        for url, message in (
+            (
+                "/api/task/?due_date_from=2030-13-01&due_date_to=2030-12-31",
+                "Invalid date format. Date format should be YYYY-MM-DD",
+            ),
+            (
+                "/api/project/?created_date_from=01/01/2030&created_date_to=2030-01-31",
+                "Invalid date format. Date format should be YYYY-MM-DD",
+            ),
+            ("/api/task/?due_date_from=2030-01-01", "End date is required"),
+            ("/api/task/?created_date_to=2030-01-01", "Start date is required"),
+            ("/api/task/?status=DONE", "Invalid status option"),
+            ("/api/project/?is_active=maybe", "Invalid is_active option"),
+            ("/api/task/?search=x&search_mode=fuzzy", "Invalid search mode"),
+            (
+                "/api/task/?search=x&sort_by=relevance",
+                "Sorting by relevance requires search_mode=fulltext",
+            ),
+        ):
+            response = self.client.get(url)
+
+            self.assertEqual(response.status_code, 400, url)
+            self.assertEqual(response.data["code"], "40007")
+            self.assertEqual(response.data["message"], message)
+
+
+@override_settings(LIST_CACHE_TIMEOUT=0)
+class SearchTestCase(APITestCase):
+    """
+    search= MATCHES SUBSTRINGS; THE STORED search_vector FOLLOWS EVERY WRITE
+    PATH AND BACKS search_mode=fulltext AND sort_by=relevance
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.create(
+            user=self.user, name="apollo", description="moon mission"
+        )
+
+    def create_task(self, title, description="description"):
+        return ProjectTask.create(
+            project=self.project,
+            title=title,
+            description=description,
+            due_date=timezone.now(),
+            priority_level="LOW",
+        )
+
+    def assert_found(self, model, term, instances):
+        found = model.objects.search(term, mode="fulltext").order_by("id")
+        self.assertEqual(list(found), sorted(instances, key=lambda item: item.id))
+
+    def test_vector_follows_writes(self):
+        self.assert_found(Project, "moon", [self.project])
+
+        self.project.description = "mars landing"
+        self.project.save()
+        self.assert_found(Project, "moon", [])
+        self.assert_found(Project, "mars", [self.project])
+
+        task = self.create_task("draft budget")
+        self.assert_found(ProjectTask, "budget", [task])
+
+        task.save_changes(title="final budget")
+        self.assert_found(ProjectTask, "draft", [])
+
+        ProjectTask.update(task.id, title="hiring plan")
+        self.assert_found(ProjectTask, "budget", [])
+        self.assert_found(ProjectTask, "hiring", [task])
+
+        # a save that does not touch title / description keeps the vector
+        task = ProjectTask.objects.get(id=task.id)
+        task.save_changes(priority_level="HIGH")
+        self.assert_found(ProjectTask, "hiring", [task])
+
+        task.title = "travel plan"
+        ProjectTask.update_many([task], fields=["title"])
+        self.assert_found(ProjectTask, "travel", [task])
+
+        projects = Project.create_many(
+            [Project(user=self.user, name="venus", description="probe")]
+        )
+        tasks = ProjectTask.create_many(
+            [
+                ProjectTask(
+                    project=self.project,
+                    title="bulk inserted",
+                    description="searchable",
+                    due_date=timezone.now(),
+                    priority_level="LOW",
+                )
+            ]
+        )
+        self.assert_found(Project, "venus", projects)
+        self.assert_found(ProjectTask, "searchable", tasks)
+
+    def test_websearch_syntax(self):
+        report = self.create_task("quarterly report", "sales numbers")
+        summary = self.create_task("report summary", "quarterly sales")
+        slides = self.create_task("slides", "conference talk")
+
+        self.assert_found(ProjectTask, '"quarterly report"', [report])
+        self.assert_found(ProjectTask, "report -summary", [report])
+        self.assert_found(ProjectTask, "summary or slides", [summary, slides])
+        # stemmed: "reports" matches "report"
+        self.assert_found(ProjectTask, "reports", [report, summary])
+
+        response = self.client.get(
+            '/api/task/?search="quarterly report"&search_mode=fulltext'
+        )
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]["data"]], [report.id]
+        )
+
+    def test_contains_by_default(self):
+        report = self.create_task("quarterly report", "sales numbers")
+        self.create_task("reporting", "weekly")
+        slides = self.create_task("slides", "Q3 SALES")
+
+        # substrings, case-insensitive, no stemming or websearch syntax
+        response = self.client.get("/api/task/?search=sales")
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]["data"]],
+            [report.id, slides.id],
+        )
+        response = self.client.get("/api/task/?search=report -summary")
+        self.assertEqual(response.data["results"]["data"], [])
+
+    def test_relevance_with_cursor(self):
+        # title matches (weight A) rank above description matches (weight B)
+        in_description = [self.create_task(f"task {i}", "rocket") for i in range(3)]
+        in_title = [self.create_task("rocket", f"task {i}") for i in range(3)]
+        self.create_task("unrelated")
+
+        expected = [task.id for task in reversed(in_title)] + [
+            task.id for task in reversed(in_description)
+        ]
+
+        url = "/api/task/?search=rocket&search_mode=fulltext&sort_by=relevance"
+        response = self.client.get(url)
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]["data"]], expected
+        )
+
+        url = f"{url}&pagination=cursor&page_size=2"
+        ids = []
+        while url:
+            page = self.client.get(url).data
+            ids += [row["id"] for row in page["results"]["data"]]
+            url = page["next"]
+        self.assertEqual(ids, expected)
+
+        # and back from the last page
+        previous = self.client.get(page["previous"]).data
+        self.assertEqual(
+            [row["id"] for row in previous["results"]["data"]], expected[2:4]
+        )
+
+
+@override_settings(LIST_CACHE_TIMEOUT=0)
+class KeysetPaginationTestCase(APITestCase):
+    """
+    pagination=cursor WALKS THE LIST BOTH WAYS IN EVERY sort_by ORDER
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.projects = [
+            Project.create(user=self.user, name=f"project {index}", description="d")
+            for index in range(7)
+        ]
+        self.ids = [project.id for project in self.projects]
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        ids = [row["id"] for row in response.data["results"]["data"]]
+        return ids, response.data["next"], response.data["previous"]
+
+    def walk(self, url):
+        pages = []
+        next_url = url
+        while next_url:
+            ids, next_url, _ = self.get_page(next_url)
+            pages.append(ids)
+
+        return pages
+
+    def test_next_and_previous_links(self):
+        url = "/api/project/?pagination=cursor&page_size=3"
+
+        ids, next_url, previous_url = self.get_page(url)
+        self.assertEqual(ids, self.ids[:3])
+        self.assertIsNone(previous_url)
+        self.assertIn("page_size=3", next_url)
+
+        ids, next_url, previous_url = self.get_page(next_url)
+        self.assertEqual(ids, self.ids[3:6])
+
+        ids, last_next, last_previous = self.get_page(next_url)
+        self.assertEqual(ids, self.ids[6:])
+        self.assertIsNone(last_next)
+
+        ids, _, _ = self.get_page(last_previous)
+        self.assertEqual(ids, self.ids[3:6])
+
+        ids, next_url, previous_url = self.get_page(previous_url)
+        self.assertEqual(ids, self.ids[:3])
+        self.assertIsNone(previous_url)
+
+    def test_orderings(self):
+        url = "/api/project/?pagination=cursor&page_size=3"
+        self.assertEqual(
+            self.walk(f"{url}&sort_by=asc"),
+            [self.ids[:3], self.ids[3:6], self.ids[6:]],
+        )
+
+        descending = self.ids[::-1]
+        self.assertEqual(
+            self.walk(f"{url}&sort_by=desc"),
+            [descending[:3], descending[3:6], descending[6:]],
+        )
+
+        # equal ranks fall back to -id
+        Project.objects.filter(id=self.ids[2]).update(name="project project")
+        Project.update_search_vector(id=self.ids[2])
+        relevance = [self.ids[2], *(pk for pk in descending if pk != self.ids[2])]
+        search = "search=project&search_mode=fulltext"
+        self.assertEqual(
+            sum(self.walk(f"{url}&sort_by=relevance&{search}"), []),
+            relevance,
+        )
+
+    def test_page_size(self):
+        for index in range(100):
+            Project.create(user=self.user, name=f"extra {index}", description="d")
+
+        for page_size, expected in (("500", 100), ("0", 10), ("x", 10), ("5", 5)):
+            ids, _, _ = self.get_page(
+                f"/api/project/?pagination=cursor&page_size={page_size}"
+            )
+            self.assertEqual(len(ids), expected, page_size)
+
+    def test_malformed_cursor(self):
+        valid = self.get_page("/api/project/?pagination=cursor&page_size=3")[1]
+        id_cursor = valid.split("cursor=")[1].split("&")[0]
+
+        for cursor in (
+            "not-base64!",
+            "bm90IGpzb24=",  # "not json"
+            "eyJyIjogMH0=",  # {"r": 0}, no position
+            "eyJwIjogWyJ4Il0sICJyIjogMH0=",  # {"p": ["x"], "r": 0}
+            "eyJwIjogW0luZmluaXR5XSwgInIiOiAwfQ==",  # {"p": [Infinity], "r": 0}
+            "eyJwIjogW05hTl0sICJyIjogMH0=",  # {"p": [NaN], "r": 0}
+            "eyJwIjogWzk5OTk5OTk5OTk5OTk5OTk5OTk5XSwgInIiOiAwfQ==",  # past bigint
+            "eyJwIjogWzFdLCAiciI6IEluZmluaXR5fQ==",  # {"p": [1], "r": Infinity}
+        ):
+            response = self.client.get(
+                f"/api/project/?pagination=cursor&cursor={cursor}"
+            )
+
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.data["message"], "Invalid cursor")
+
+        # a cursor of one ordering is not valid for another
+        response = self.client.get(
+            "/api/project/?pagination=cursor&sort_by=relevance&search=project"
+            f"&search_mode=fulltext&cursor={id_cursor}"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskUpdateQueryCountTestCase(APITestCase):
+    """
+    PUT AND PATCH ON A TASK MUST TAKE AT MOST TWO STATEMENTS: ONE SELECT AND
+    ONE UPDATE. WRITING THE STATUS ADDS ONE SELECT FOR UPDATE OF THE STORED
+    STATUS AND ONE UPDATE OF THE PROJECT COUNTERS
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        # skip JWT authentication so only the view's own queries are counted
+        self.client.force_authenticate(user=self.user)
+
+        project = Project.create(
+            user=self.user, name="project", description="description"
+        )
+        self.task = ProjectTask.create(
+            project=project,
+            title="task",
+            description="description",
+            due_date=timezone.now(),
+            priority_level="HIGH",
+        )
+
+    def test_put_query_count(self):
+        payload = {
+            "project_id": self.task.project_id,
+            "title": "renamed task",
+            "description": "new description",
+            "due_date": "2030-01-31",
+            "priority_level": "LOW",
+            "status": "IN_PROGRESS",
+        }
+
+        with self.assertNumQueries(4):
+            response = self.client.put(
+                f"/api/task/?task_id={self.task.id}", payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["task"]["title"], "renamed task")
+        self.assertEqual(response.data["task"]["due_date"], "2030-01-31")
+        self.assertEqual(
+            response.data["task"]["project"]["user"]["username"], "testuser"
+        )
+        self.assertEqual(response.data["task"]["project"]["in_progress_count"], 1)
+        self.assertEqual(response.data["task"]["project"]["to_do_count"], 0)
+
+        task = ProjectTask.objects.get(id=self.task.id)
+        self.assertEqual(task.status, "IN_PROGRESS")
+        self.assertGreater(task.updated_at, self.task.updated_at)
+        # the PUT also rewrote the search vector
+        found = ProjectTask.objects.search("renamed", mode="fulltext")
+        self.assertTrue(found.filter(id=task.id).exists())
+
+    def test_patch_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.patch(
+                f"/api/task/?task_id={self.task.id}",
+                {"title": "renamed task"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["task"]["title"], "renamed task")
+        self.assertEqual(response.data["task"]["status"], "TO_DO")
+        self.assertEqual(response.data["task"]["project"]["to_do_count"], 1)
+
+        task = ProjectTask.objects.get(id=self.task.id)
+        self.assertEqual(task.title, "renamed task")
+        self.assertEqual(task.priority_level, "HIGH")
+        self.assertGreater(task.updated_at, self.task.updated_at)
+        self.assertEqual(
+            task.project.last_activity_at, self.task.project.last_activity_at
+        )
+
+    def test_patch_status_query_count(self):
+        with self.assertNumQueries(4):
+            response = self.client.patch(
+                f"/api/task/?task_id={self.task.id}",
+                {"status": "COMPLETED"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["task"]["status"], "COMPLETED")
+
+        task = ProjectTask.objects.get(id=self.task.id)
+        self.assertEqual(task.status, "COMPLETED")
+        self.assertGreater(task.updated_at, self.task.updated_at)
+
+
+class ListCacheTestCase(APITestCase):
+    """
+    REPEATED LIST POLLS ARE SERVED FROM THE CACHE UNTIL THE USER'S DATA CHANGES
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.project = Project.create(
+            user=self.user, name="project", description="description"
+        )
+
+    def create_task(self, title):
+        payload = {
+            "project_id": self.project.id,
+            "title": title,
+            "description": "description",
+            "due_date": "2030-01-31",
+            "priority_level": "HIGH",
+            "status": "TO_DO",
+        }
+
+        # the version bump runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/task/", payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        return response.data["task"]
+
+    def test_repeated_poll_hits_cache(self):
+        self.create_task("first task")
+
+        first = self.client.get("/api/task/?sort_by=asc&search=task")
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/task/?search=task&sort_by=asc")
+
+        self.assertEqual(first.data, second.data)
+
+    def count_listed_tasks(self):
+        return len(self.client.get("/api/task/").data["results"]["data"])
+
+    def test_save_and_delete_invalidate_cache(self):
+        self.create_task("first task")
+        self.assertEqual(self.count_listed_tasks(), 1)
+
+        task = self.create_task("second task")
+        self.assertEqual(self.count_listed_tasks(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/task/?task_id={task['id']}")
+
+        self.assertEqual(self.count_listed_tasks(), 1)
+
+
+class ConditionalListTestCase(APITestCase):
+    """
+    LIST ENDPOINTS ANSWER If-None-Match WITH 304
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.project = Project.create(
+            user=self.user, name="project", description="description"
+        )
+
+    @override_settings(LIST_CACHE_TIMEOUT=0)
+    def test_not_modified_before_serializing(self):
+        response = self.client.get("/api/project/")
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        # a single aggregate query, no page query
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/project/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    @override_settings(LIST_CACHE_TIMEOUT=0)
+    def test_delete_invalidates_etag(self):
+        other = Project.create(user=self.user, name="other", description="other")
+        etag = self.client.get("/api/project/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/project/?project_id={other.id}")
+
+        response = self.client.get(
+            "/api/project/",
+            HTTP_IF_NONE_MATCH=etag,
+            HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]["data"]), 1)
+
+    @override_settings(LIST_CACHE_TIMEOUT=0)
+    def test_cursor_page_has_no_etag(self):
+        # only the page query, no aggregate over the whole list
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/project/?pagination=cursor")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    @override_settings(LIST_CACHE_TIMEOUT=0)
+    def test_change_invalidates_etag(self):
+        etag = self.client.get("/api/task/")["ETag"]
+
+        ProjectTask.create(
+            project=self.project,
+            title="task",
+            description="description",
+            due_date=timezone.now(),
+            priority_level="HIGH",
+        )
+
+        response = self.client.get("/api/task/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_cached_list_answers_not_modified(self):
+        etag = self.client.get("/api/project/")["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/project/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+
+class TokenIssueTestCase(APITestCase):
+    def test_login_returns_paired_tokens(self):
+        user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+
+        response = self.client.post(
+            "/api/account/login/",
+            {"username_or_email": "testuser", "password": "testuser"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        refresh = RefreshToken(response.data["tokens"]["refresh"])
+        access = AccessToken(response.data["tokens"]["access"])
+
+        self.assertEqual(access["user_id"], user.id)
+        self.assertEqual(access["user_id"], refresh["user_id"])
+        self.assertNotEqual(access["jti"], refresh["jti"])
+
+
+class LoginTestCase(APITestCase):
+    """
+    EmailAndUsernameBackend: ONE QUERY FOR E-MAIL OR USERNAME, ONE HASH
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+
+    def login(self, username_or_email, password):
+        return self.client.post(
+            "/api/account/login/",
+            {"username_or_email": username_or_email, "password": password},
+        )
+
+    def test_email_and_username(self):
+        for username_or_email in ("testuser@example.com", "testuser"):
+            response = self.login(username_or_email, "testuser")
+
+            self.assertEqual(response.status_code, 200, username_or_email)
+            access = AccessToken(response.data["tokens"]["access"])
+            self.assertEqual(access["user_id"], self.user.id)
+
+    def test_email_match_wins(self):
+        # another user's username is this user's e-mail
+        get_user_model().objects.create_user(
+            username="testuser@example.com", email="other@example.com", password="x"
+        )
+
+        response = self.login("testuser@example.com", "testuser")
+
+        access = AccessToken(response.data["tokens"]["access"])
+        self.assertEqual(access["user_id"], self.user.id)
+
+    def test_wrong_password_and_unknown_user(self):
+        # the backend raises, LoginApiView turns the message into a 400
+        with self.assertNumQueries(1):
+            with self.assertRaisesMessage(Exception, "Invalid Credentials"):
+                authenticate(email="testuser", password="wrong")
+
+        for username_or_email, message in (
+            ("testuser", "Invalid Credentials"),
+            ("nobody@example.com", "User does not exist"),
+        ):
+            response = self.login(username_or_email, "wrong")
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data["code"], "40001")
+            self.assertEqual(response.data["message"], message)
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+    )
+    def test_password_rehashed_on_login(self):
+        self.user.password = make_password("testuser", hasher="md5")
+        self.user.save(update_fields=["password"])
+
+        response = self.login("testuser", "testuser")
+
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(self.user.check_password("testuser"))
+
+
+@override_settings(AUTH_USER_CACHE_TTL=0)
+class DeletedTokenUserTestCase(APITestCase):
+    """
+    A TOKEN OF A DELETED USER IS REJECTED WITH 401, NOT A SERVER ERROR
+    """
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.token = AccessToken.for_user(user)
+        user.delete()
+
+    def test_create_project(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+        response = self.client.post(
+            "/api/project/", {"name": "project", "description": "description"}
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["code"], "user_not_found")
+        self.assertFalse(Project.objects.exists())
+
+    async def test_async_create_project(self):
+        request = APIRequestFactory().post(
+            "/api/project/",
+            {"name": "project", "description": "description"},
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+        response = await AsyncProjectApiView.as_view()(request)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["code"], "user_not_found")
+
+
+class CreateAccountConcurrencyTestCase(APITransactionTestCase):
+    def signup(self, username, email, responses):
+        try:
+            responses.append(
+                APIClient().post(
+                    "/api/account/create/",
+                    {
+                        "username": username,
+                        "email": email,
+                        "password": "testuser",
+                        "confirm_password": "testuser",
+                    },
+                )
+            )
+        finally:
+            connections.close_all()
+
+    def run_parallel(self, signups):
+        responses = []
+        barrier = threading.Barrier(len(signups))
+
+        def target(username, email):
+            barrier.wait()
+            self.signup(username, email, responses)
+
+        threads = [threading.Thread(target=target, args=signup) for signup in signups]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return responses
+
+    def test_parallel_signups_with_same_email(self):
+        responses = self.run_parallel(
+            [(f"testuser{index}", "testuser@example.com") for index in range(5)]
+        )
+
+        self.assertEqual(sorted(r.status_code for r in responses), [201] + [400] * 4)
+        for response in responses:
+            if response.status_code == 400:
+                self.assertEqual(response.data["email"], "Email already exists")
+        self.assertEqual(
+            get_user_model().objects.filter(email="testuser@example.com").count(), 1
+        )
+
+    def test_parallel_signups_with_same_username(self):
+        responses = self.run_parallel(
+            [("testuser", f"testuser{index}@example.com") for index in range(5)]
+        )
+
+        self.assertEqual(sorted(r.status_code for r in responses), [201] + [400] * 4)
+        for response in responses:
+            if response.status_code == 400:
+                self.assertEqual(response.data["username"], "Username already exists")
+
+
+@override_settings(LIST_CACHE_TIMEOUT=0)
+class AsyncViewTestCase(APITestCase):
+    """
+    THE ASYNC VIEWS MUST ANSWER LIKE THE SYNC ONES
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.factory = APIRequestFactory()
+
+        self.project = Project.create(
+            user=self.user, name="project", description="description"
+        )
+        for index in range(15):
+            ProjectTask.create(
+                project=self.project,
+                title=f"task {index}",
+                description="description",
+                due_date=timezone.now() + timedelta(days=index),
+                priority_level="HIGH",
+            )
+
+    def get(self, url):
+        return self.factory.get(url, HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    async def test_lists_match_sync_views(self):
+        for url, sync_view, async_view in (
+            ("/api/project/", ProjectApiView, AsyncProjectApiView),
+            ("/api/task/?sort_by=desc", ProjectTaskApiView, AsyncProjectTaskApiView),
+            (
+                "/api/task/?pagination=cursor",
+                ProjectTaskApiView,
+                AsyncProjectTaskApiView,
+            ),
+        ):
+            expected = await sync_to_async(sync_view.as_view())(self.get(url))
+            response = await async_view.as_view()(self.get(url))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, expected.data)
+            self.assertEqual(response.get("ETag"), expected.get("ETag"))
+
+    async def test_create_and_delete_task(self):
+        view = AsyncProjectTaskApiView.as_view()
+
+        request = self.factory.post(
+            "/api/task/",
+            {
+                "project_id": self.project.id,
+                "title": "new task",
+                "description": "description",
+                "due_date": "2030-01-01",
+                "priority_level": "LOW",
+                "status": "TO_DO",
+            },
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        response = await view(request)
+        self.assertEqual(response.status_code, 201)
+        task_data = response.data["task"]
+        self.assertEqual(task_data["project"]["user"]["username"], "testuser")
+
+        task_id = task_data["id"]
+        request = self.factory.delete(
+            f"/api/task/?task_id={task_id}", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        response = await view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(await ProjectTask.objects.filter(id=task_id).aexists())
+
+
+class TaskBulkTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.create(user=self.user, name="project", description="d")
+        self.target = Project.create(user=self.user, name="target", description="d")
+        self.task = self.create_task(self.project)
+
+        stranger = get_user_model().objects.create_user(
+            username="stranger", email="stranger@example.com", password="stranger"
+        )
+        self.foreign_project = Project.create(
+            user=stranger, name="foreign", description="d"
+        )
+        self.foreign_task = self.create_task(self.foreign_project)
+
+    def create_task(self, project):
+        return ProjectTask.create(
+            project=project,
+            title="task",
+            description="description",
+            due_date=timezone.now(),
+            priority_level="HIGH",
+        )
+
+    def get_item(self, project_id, **extra):
+        return {
+            "project_id": project_id,
+            "title": "bulk",
+            "description": "description",
+            "due_date": "2030-01-01",
+            "priority_level": "LOW",
+            "status": "TO_DO",
+            **extra,
+        }
+
+    def post(self, payload):
+        return self.client.post("/api/task/bulk/", payload, format="json")
+
+    def test_result_shape(self):
+        other = self.create_task(self.project)
+
+        response = self.post(
+            {
+                "create": [self.get_item(self.project.id)] * 2,
+                "update": [self.get_item(self.project.id, id=self.task.id)],
+                "delete": [other.id],
+            }
+        )
+
+        self.assertEqual(response.status_code, 200)
+        created = response.data["created"]
+        self.assertEqual([item["index"] for item in created], [0, 1])
+        self.assertEqual(
+            ProjectTask.objects.filter(id__in=[item["id"] for item in created]).count(),
+            2,
+        )
+        self.assertEqual(response.data["updated"], [{"index": 0, "id": self.task.id}])
+        self.assertEqual(response.data["deleted"], [{"index": 0, "id": other.id}])
+        self.assertFalse(ProjectTask.objects.filter(id=other.id).exists())
+
+    def test_update_moves_task(self):
+        response = self.post(
+            {"update": [self.get_item(self.target.id, id=self.task.id)]}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.project_id, self.target.id)
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.task_count, 1)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.task_count, 0)
+
+    def test_unknown_and_foreign_ids(self):
+        response = self.post(
+            {
+                "create": [
+                    self.get_item(self.project.id),
+                    self.get_item(self.foreign_project.id),
+                    self.get_item(0),
+                ],
+                "update": [
+                    self.get_item(self.project.id, id=self.foreign_task.id),
+                    self.get_item(self.foreign_project.id, id=self.task.id),
+                    self.get_item(self.project.id, id=0),
+                ],
+                "delete": [self.task.id, self.foreign_task.id],
+            }
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["code"], "40004")
+        errors = response.data["errors"]
+        self.assertEqual([error["index"] for error in errors["create"]], [1, 2])
+        self.assertEqual(
+            errors["update"],
+            [
+                {"index": 0, "id": ["Task not found"]},
+                {"index": 1, "project_id": ["Project not found"]},
+                {"index": 2, "id": ["Task not found"]},
+            ],
+        )
+        self.assertEqual(errors["delete"], [{"index": 1, "id": ["Task not found"]}])
+
+        # nothing is applied when any item fails
+        self.assertEqual(ProjectTask.objects.count(), 2)
+        self.foreign_task.refresh_from_db()
+        self.assertEqual(self.foreign_task.title, "task")
+
+    def test_operation_limit(self):
+        with mock.patch.object(TaskBulkSerializer, "MAX_OPERATIONS", 2):
+            response = self.post(
+                {
+                    "create": [self.get_item(self.project.id)] * 2,
+                    "delete": [self.task.id],
+                }
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["code"], "40005")
+        self.assertEqual(ProjectTask.objects.count(), 2)
+
+        response = self.post({})
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+        project = Project.create(user=self.user, name="project", description="one")
+        Project.create(user=self.user, name="empty", description="two")
+        for index in range(3):
+            ProjectTask.create(
+                project=project,
+                title=f"task {index}",
+                description="description",
+                due_date=timezone.now(),
+                priority_level="HIGH",
+            )
+
+        other = get_user_model().objects.create_user(username="other", password="other")
+        Project.create(user=other, name="other", description="other")
+
+    def export(self, export_format):
+        response = self.client.get(f"/api/export/?export_format={export_format}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_ndjson_export(self):
+        rows = [json.loads(line) for line in self.export("ndjson").splitlines()]
+
+        self.assertEqual([row["type"] for row in rows], ["project"] * 2 + ["task"] * 3)
+        self.assertEqual(rows[0]["name"], "project")
+        self.assertEqual(rows[2]["title"], "task 0")
+        self.assertNotIn("search_vector", rows[2])
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(self.export("csv").splitlines()))
+
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            [row["task_title"] for row in rows[:3]], ["task 0", "task 1", "task 2"]
+        )
+        self.assertEqual(rows[3]["project_name"], "empty")
+        self.assertEqual(rows[3]["task_id"], "")
+
+    def test_invalid_export_format(self):
+        response = self.client.get("/api/export/?export_format=xml")
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.existing = Project.create(
+            user=self.user, name="existing", description="description"
+        )
+
+    def upload(self, content, import_format):
+        upload = SimpleUploadedFile(f"tasks.{import_format}", content.encode("utf-8"))
+        return self.client.post(
+            "/api/import/",
+            {"file": upload, "import_format": import_format},
+            format="multipart",
+        )
+
+    def test_ndjson_import(self):
+        task = {
+            "type": "task",
+            "title": "task",
+            "description": "description",
+            "due_date": "2030-01-01",
+            "priority_level": "HIGH",
+            "status": "TO_DO",
+        }
+        lines = [
+            {"type": "project", "id": "p1", "name": "imported", "description": "d"},
+            {**task, "project_id": "p1"},
+            {**task, "project_id": self.existing.id},
+            {**task, "project_id": "missing"},
+            {**task, "project_id": "p1", "status": "UNKNOWN"},
+        ]
+        content = "\n".join(json.dumps(line) for line in lines) + "\nnot json\n"
+
+        response = self.upload(content, "ndjson")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["projects_created"], 1)
+        self.assertEqual(response.data["tasks_created"], 2)
+        errors = response.data["errors"]
+        self.assertEqual([error["row"] for error in errors], [4, 5, 6])
+
+        imported = Project.objects.get(name="imported")
+        self.assertEqual(imported.tasks.count(), 1)
+        self.assertEqual(self.existing.tasks.count(), 1)
+        # bulk inserted rows are searchable too
+        self.assertTrue(ProjectTask.objects.search("task", mode="fulltext").exists())
+
+    def test_not_utf8_imports_nothing(self):
+        project = {"type": "project", "name": "imported", "description": "d"}
+        content = "\n".join(json.dumps(project) for _ in range(1500)).encode("utf-8")
+        upload = SimpleUploadedFile("tasks.ndjson", content + b"\n\xff\n")
+
+        response = self.client.post(
+            "/api/import/", {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "File is not UTF-8 encoded")
+        self.assertFalse(Project.objects.filter(name="imported").exists())
+
+    def test_invalid_csv_reports_partial_import(self):
+        rows = [f"p{index},imported,d,,,,," for index in range(1001)]
+        content = "\n".join(
+            [
+                "project_id,project_name,project_description,task_title,"
+                "task_description,task_due_date,task_priority_level,task_status",
+                *rows,
+                f"p1001,{'x' * (csv.field_size_limit() + 1)},d,,,,,",
+            ]
+        )
+
+        response = self.upload(content, "csv")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data["message"].startswith("Invalid CSV"))
+        self.assertEqual(response.data["rows"], 1000)
+        self.assertEqual(response.data["projects_created"], 1000)
+        self.assertEqual(Project.objects.filter(name="imported").count(), 1000)
+
+    def test_csv_rows_split_across_batches(self):
+        header = (
+            "project_id,project_name,project_description,task_title,"
+            "task_description,task_due_date,task_priority_level,task_status"
+        )
+        lines = [
+            f"p{index},project,d,task,d,2030-01-01,LOW,TO_DO" for index in range(3)
+        ]
+        records = list(iter_csv_records([header, *lines]))
+
+        # the second line's project and task records land in separate batches
+        importer = Importer(self.user.id, batch_size=3).run(records)
+
+        self.assertEqual(len(records), 6)
+        self.assertEqual(importer.rows, 3)
+        self.assertEqual(importer.tasks_created, 3)
+
+    def test_csv_export_round_trip(self):
+        ProjectTask.create(
+            project=self.existing,
+            title="exported",
+            description="description",
+            due_date=timezone.now(),
+            priority_level="HIGH",
+        )
+        exported = b"".join(
+            self.client.get("/api/export/?export_format=csv").streaming_content
+        )
+
+        response = self.upload(exported.decode("utf-8"), "csv")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["errors"], [])
+        # one line holds the project and its task
+        self.assertEqual(response.data["rows"], 1)
+        self.assertEqual(response.data["projects_created"], 1)
+        self.assertEqual(response.data["tasks_created"], 1)
+        self.assertEqual(
+            ProjectTask.objects.for_user(self.user.id).filter(title="exported").count(),
+            2,
+        )
+
+
+@override_settings(LIST_CACHE_TIMEOUT=0)
+class TaskStatsTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+        self.project = Project.create(user=self.user, name="project", description="d")
+        self.empty = Project.create(user=self.user, name="empty", description="d")
+
+        now = timezone.now()
+        for status, due_date in (
+            ("TO_DO", now - timedelta(days=1)),
+            ("IN_PROGRESS", now - timedelta(days=1)),
+            ("COMPLETED", now - timedelta(days=1)),
+            ("TO_DO", now + timedelta(minutes=1)),
+            ("TO_DO", now + timedelta(days=30)),
+        ):
+            ProjectTask.create(
+                project=self.project,
+                title="task",
+                description="description",
+                due_date=due_date,
+                priority_level="HIGH",
+                status=status,
+            )
+
+    def test_stats(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/task/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        overall = response.data["data"]["overall"]
+        projects = response.data["data"]["projects"]
+
+        self.assertEqual(overall["total"], 5)
+        self.assertEqual(
+            overall["by_status"], {"TO_DO": 3, "IN_PROGRESS": 1, "COMPLETED": 1}
+        )
+        self.assertEqual(overall["overdue"], 2)
+        self.assertEqual(overall["completion_rate"], 0.2)
+        self.assertEqual(
+            projects[0], {"project_id": self.project.id, "name": "project", **overall}
+        )
+        self.assertEqual(projects[1]["total"], 0)
+        self.assertEqual(projects[1]["completion_rate"], 0.0)
+
+    @override_settings(LIST_CACHE_TIMEOUT=60)
+    def test_cached_stats_have_no_validators(self):
+        cache.clear()
+        first = self.client.get("/api/task/stats/")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/task/stats/")
+
+        self.assertEqual(second.data, first.data)
+        for response in (first, second):
+            self.assertFalse(response.has_header("ETag"))
+            self.assertFalse(response.has_header("Last-Modified"))
+
+
+class TaskCounterTestCase(APITestCase):
+    """
+    THE PROJECT TASK COUNTERS MUST FOLLOW EVERY WAY TASKS ARE WRITTEN
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.create(user=self.user, name="project", description="d")
+        self.other = Project.create(user=self.user, name="other", description="d")
+
+    def create_task(self, project=None, status="TO_DO"):
+        return ProjectTask.create(
+            project=project or self.project,
+            title="task",
+            description="description",
+            due_date=timezone.now(),
+            priority_level="HIGH",
+            status=status,
+        )
+
+    def assert_counters(self, project, total, to_do=0, in_progress=0, completed=0):
+        project.refresh_from_db()
+        self.assertEqual(
+            (
+                project.task_count,
+                project.to_do_count,
+                project.in_progress_count,
+                project.completed_count,
+            ),
+            (total, to_do, in_progress, completed),
+        )
+
+    def test_single_task_writes(self):
+        task = self.create_task()
+        self.create_task(status="COMPLETED")
+        self.assert_counters(self.project, 2, to_do=1, completed=1)
+        self.assertIsNotNone(self.project.last_activity_at)
+
+        task = ProjectTask.objects.get(id=task.id)
+        task.save_changes(status="IN_PROGRESS")
+        self.assert_counters(self.project, 2, in_progress=1, completed=1)
+
+        ProjectTask.update(task.id, status="COMPLETED", project=self.other)
+        self.assert_counters(self.project, 1, completed=1)
+        self.assert_counters(self.other, 1, completed=1)
+
+        ProjectTask.objects.get(id=task.id).delete()
+        self.assert_counters(self.other, 0)
+
+        ProjectTask.objects.filter(project=self.project).delete()
+        self.assert_counters(self.project, 0)
+
+    def test_stale_instances(self):
+        task = self.create_task()
+        first = ProjectTask.objects.get(id=task.id)
+        second = ProjectTask.objects.get(id=task.id)
+
+        # both were loaded as TO_DO, only the first save moves the counters
+        first.save_changes(status="COMPLETED")
+        second.save_changes(status="COMPLETED")
+        self.assert_counters(self.project, 1, completed=1)
+
+        second.status = "IN_PROGRESS"
+        second.save()
+        self.assert_counters(self.project, 1, in_progress=1)
+
+        first.delete()
+        self.assert_counters(self.project, 0)
+
+    def test_bulk_writes(self):
+        tasks = [self.create_task(), self.create_task()]
+
+        response = self.client.post(
+            "/api/task/bulk/",
+            {
+                "create": [
+                    {
+                        "project_id": self.other.id,
+                        "title": "new",
+                        "description": "description",
+                        "due_date": "2030-01-01",
+                        "priority_level": "LOW",
+                        "status": "IN_PROGRESS",
+                    }
+                ],
+                "update": [
+                    {
+                        "id": tasks[0].id,
+                        "project_id": self.project.id,
+                        "title": "done",
+                        "description": "description",
+                        "due_date": "2030-01-01",
+                        "priority_level": "LOW",
+                        "status": "COMPLETED",
+                    }
+                ],
+                "delete": [tasks[1].id],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assert_counters(self.project, 1, completed=1)
+        self.assert_counters(self.other, 1, in_progress=1)
+
+    def test_project_list_shows_counters(self):
+        self.create_task()
+        self.create_task(status="COMPLETED")
+
+        response = self.client.get("/api/project/?sort_by=asc")
+
+        project = response.data["results"]["data"][0]
+        self.assertEqual(project["task_count"], 2)
+        self.assertEqual(project["completed_count"], 1)
+
+    def test_repair_command(self):
+        self.create_task()
+        Project.objects.filter(id=self.project.id).update(task_count=5, to_do_count=0)
+
+        call_command("repair_task_counters", stdout=io.StringIO())
+
+        self.assert_counters(self.project, 1, to_do=1)
+        self.assert_counters(self.other, 0)
+
+
+class ProjectPurgeTestCase(APITestCase):
+    """
+    DELETING A PROJECT HIDES IT AT ONCE, ITS TASKS ARE PURGED IN BATCHES LATER
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.create(user=self.user, name="project", description="d")
+        self.other = Project.create(user=self.user, name="other", description="d")
+        ProjectTask.create_many(
+            [
+                ProjectTask(
+                    project=project,
+                    title=f"task {index}",
+                    description="description",
+                    due_date=timezone.now(),
+                    priority_level="LOW",
+                )
+                for project in (self.project, self.other)
+                for index in range(5)
+            ]
+        )
+
+    def test_delete_hides_project_and_tasks(self):
+        response = self.client.delete(f"/api/project/?project_id={self.project.id}")
+
+        self.assertEqual(response.status_code, 200)
+        job = self.client.get(f"/api/job/?job_id={response.data['job_id']}")
+        self.assertEqual(job.data["job"]["kind"], "purge_project")
+        self.assertEqual(job.data["job"]["status"], "QUEUED")
+
+        self.project.refresh_from_db()
+        self.assertFalse(self.project.is_active)
+        self.assertEqual(ProjectTask.objects.filter(project=self.project).count(), 5)
+
+        projects = self.client.get("/api/project/").data["results"]["data"]
+        self.assertEqual([project["id"] for project in projects], [self.other.id])
+        tasks = self.client.get("/api/task/").data["results"]["data"]
+        self.assertEqual({task["project"]["id"] for task in tasks}, {self.other.id})
+
+        response = self.client.patch(
+            f"/api/project/?project_id={self.project.id}", {"name": "renamed"}
+        )
+        self.assertEqual(response.data["code"], "40004")
+
+    def test_purge_job(self):
+        response = self.client.delete(f"/api/project/?project_id={self.project.id}")
+
+        self.assertEqual(work(burst=True), 1)
+
+        job = self.client.get(f"/api/job/?job_id={response.data['job_id']}").data
+        self.assertEqual(job["job"]["status"], "SUCCEEDED")
+        self.assertEqual(job["job"]["progress"], {"deleted": 5, "total": 5})
+        self.assertEqual(job["job"]["result"], {"deleted": 5})
+        self.assertFalse(Project.objects.filter(id=self.project.id).exists())
+
+    def test_stale_save_keeps_project_deleted(self):
+        stale = Project.objects.get(id=self.project.id)
+        self.project.mark_deleted()
+
+        stale.name = "renamed"
+        stale.save()
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.name, "renamed")
+        self.assertIsNotNone(self.project.deleted_at)
+        self.assertFalse(
+            Project.objects.for_user(self.user.id).filter(id=self.project.id).exists()
+        )
+
+    def test_purge_stops_when_project_not_deleted(self):
+        self.project.mark_deleted()
+        Project.objects.filter(id=self.project.id).update(deleted_at=None)
+
+        self.assertIsNone(purge_project(self.project.id))
+        self.assertEqual(ProjectTask.objects.filter(project=self.project).count(), 5)
+
+        # undeleted between two batches
+        def undelete(project_id, deleted, total):
+            Project.objects.filter(id=project_id).update(deleted_at=None)
+
+        self.project.mark_deleted()
+        self.assertIsNone(
+            purge_project(self.project.id, batch_size=2, on_batch=undelete)
+        )
+        self.assertEqual(ProjectTask.objects.filter(project=self.project).count(), 3)
+        self.assertTrue(Project.objects.filter(id=self.project.id).exists())
+
+    def test_purge_command(self):
+        self.project.mark_deleted()
+        out = io.StringIO()
+
+        call_command("purge_deleted_projects", batch_size=2, stdout=out)
+
+        self.assertIn(f"project {self.project.id}: 5/5 tasks deleted", out.getvalue())
+        self.assertFalse(Project.objects.filter(id=self.project.id).exists())
+        self.assertFalse(
+            ProjectTask.objects.filter(project_id=self.project.id).exists()
+        )
+        self.assertEqual(ProjectTask.objects.filter(project=self.other).count(), 5)
+        self.assertIsNone(purge_project(self.project.id))
+
+
+
+def fail_job(job):
+    raise RuntimeError("boom")
+
+
+@override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY=10, JOB_LOCK_TIMEOUT=60)
+class JobTestCase(APITestCase):
+    """
+    FAILED JOBS ARE RETRIED WITH BACKOFF, THEN MARKED FAILED
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.handlers = mock.patch.dict(JOB_HANDLERS, {"fail": "main.tests.fail_job"})
+        self.handlers.start()
+        self.addCleanup(self.handlers.stop)
+
+    def test_retry_then_fail(self):
+        job = enqueue("fail", user_id=self.user.id)
+
+        started = timezone.now()
+        self.assertEqual(work(burst=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("QUEUED", 1))
+        self.assertEqual(job.error, "RuntimeError: boom")
+        self.assertGreaterEqual(job.run_at, started + timedelta(seconds=10))
+
+        # not due yet
+        self.assertEqual(work(burst=True), 0)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        self.assertEqual(work(burst=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("FAILED", 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_requeue_stale_jobs(self):
+        job = enqueue("fail")
+        self.assertEqual(claim_job().id, job.id)
+        self.assertIsNone(claim_job())
+
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(requeue_stale_jobs(), (1, 0))
+        self.assertEqual(claim_job().id, job.id)
+
+    def test_requeued_job_keeps_new_claim(self):
+        job = enqueue("fail")
+        first = claim_job()
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(minutes=5)
+        )
+        requeue_stale_jobs()
+        second = claim_job()
+
+        with self.assertLogs("main.jobs", "WARNING") as logs:
+            run_job(first)
+
+        self.assertIn("outcome was not stored", logs.output[-1])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("RUNNING", 2))
+
+        first.report_progress(step=1)
+        job.refresh_from_db()
+        self.assertIsNone(job.progress)
+
+        run_job(second)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("FAILED", 2))
+
+    def test_job_of_other_user_not_found(self):
+        job = enqueue("fail")
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(f"/api/job/?job_id={job.id}")
+
+        self.assertEqual(response.data["code"], "40004")
+
+    def test_database_error_does_not_stop_worker(self):
+        job = enqueue("fail", user_id=self.user.id)
+        claims = [mock.Mock(side_effect=OperationalError("server closed"))]
+
+        def flaky_claim_job():
+            if claims:
+                return claims.pop()()
+            return claim_job()
+
+        with mock.patch("main.jobs.claim_job", flaky_claim_job), mock.patch(
+            "main.jobs.close_old_connections"
+        ) as close_old_connections:
+            self.assertEqual(work(burst=True, poll_interval=0), 1)
+
+        close_old_connections.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("QUEUED", 1))
+
+
+class ScanDueTasksTestCase(APITestCase):
+    """
+    EACH SCAN ONLY REMINDS TASKS THAT CROSSED THEIR THRESHOLD SINCE THE LAST ONE
+    """
+
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(username=name, password=None)
+            for name in ("first", "second")
+        ]
+        self.projects = [
+            Project.create(user=user, name="project", description="d")
+            for user in self.users
+        ]
+
+    def create_task(self, project, due_date, status="TO_DO", is_active=True):
+        return ProjectTask.create(
+            project=project,
+            title="task",
+            description="description",
+            due_date=due_date,
+            priority_level="LOW",
+            status=status,
+            is_active=is_active,
+        )
+
+    def scan(self):
+        out = io.StringIO()
+        call_command("scan_due_tasks", due_soon_hours=24, stdout=out)
+        return out.getvalue()
+
+    def test_reminders_per_user_and_watermark(self):
+        now = timezone.now()
+        first, second = self.projects
+        overdue = [
+            self.create_task(first, now - timedelta(days=2)),
+            self.create_task(first, now - timedelta(hours=1)),
+            self.create_task(second, now - timedelta(hours=3)),
+        ]
+        due_soon = self.create_task(second, now + timedelta(hours=2))
+        self.create_task(first, now + timedelta(days=3))
+        self.create_task(first, now - timedelta(days=1), status="COMPLETED")
+        self.create_task(first, now - timedelta(days=1), is_active=False)
+
+        output = self.scan()
+
+        self.assertIn("OVERDUE: 2 reminders for 3 tasks", output)
+        self.assertIn("DUE_SOON: 1 reminders for 1 tasks", output)
+        reminders = {
+            (reminder.user_id, reminder.kind): reminder.task_ids
+            for reminder in Reminder.objects.all()
+        }
+        self.assertEqual(
+            reminders,
+            {
+                (self.users[0].id, "OVERDUE"): [overdue[0].id, overdue[1].id],
+                (self.users[1].id, "OVERDUE"): [overdue[2].id],
+                (self.users[1].id, "DUE_SOON"): [due_soon.id],
+            },
+        )
+
+        # nothing new crossed a threshold
+        output = self.scan()
+        self.assertIn("OVERDUE: 0 reminders for 0 tasks", output)
+        self.assertIn("DUE_SOON: 0 reminders for 0 tasks", output)
+
+        # due after the previous scan, overdue by the next one
+        late = self.create_task(first, timezone.now())
+        self.assertIn("OVERDUE: 1 reminders for 1 tasks", self.scan())
+        self.assertEqual(Reminder.objects.latest("id").task_ids, [late.id])
+
+    def test_changed_tasks_in_scanned_window(self):
+        now = timezone.now()
+        first, second = self.projects
+        completed = self.create_task(first, now - timedelta(days=1), "COMPLETED")
+        rescheduled = self.create_task(first, now + timedelta(days=5))
+        due_later = self.create_task(second, now + timedelta(days=5))
+        self.create_task(first, now - timedelta(days=1))
+        self.scan()
+        Reminder.objects.all().delete()
+
+        # created overdue, reopened, and moved back into scanned windows
+        created = self.create_task(first, now - timedelta(days=3))
+        completed.save_changes(status="TO_DO")
+        ProjectTask.update(rescheduled.id, due_date=now - timedelta(hours=1))
+        due_later.save_changes(due_date=now + timedelta(hours=3))
+
+        output = self.scan()
+
+        self.assertIn("OVERDUE: 1 reminders for 3 tasks", output)
+        self.assertIn("DUE_SOON: 1 reminders for 1 tasks", output)
+        reminders = {
+            reminder.kind: set(reminder.task_ids) for reminder in Reminder.objects.all()
+        }
+        self.assertEqual(
+            reminders,
+            {
+                "OVERDUE": {created.id, completed.id, rescheduled.id},
+                "DUE_SOON": {due_later.id},
+            },
+        )
+
+        # unchanged since, not reminded again
+        self.assertIn("OVERDUE: 0 reminders for 0 tasks", self.scan())
+
+
+
+class LeanSerializerTestCase(APITestCase):
+    """
+    THE LEAN READ PATH AND FastJSONRenderer MUST WRITE THE SAME BYTES AS THE
+    MODEL SERIALIZERS AND JSONRenderer
+    """
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        projects = [
+            Project.create(user=user, name="projet \u00e9t\u00e9", description="d"),
+            Project.create(user=user, name="line\u2028separator", description="\u2029"),
+        ]
+        projects[1].mark_deleted()
+
+        for index, project in enumerate(projects):
+            ProjectTask.create(
+                project=project,
+                title=f"t\u00e2che {index} \U0001f600",
+                description='quote " and \\ backslash',
+                due_date=timezone.now() - timedelta(days=index),
+                priority_level="HIGH",
+                status=ProjectTask.STATUS_OPTIONS[index][0],
+            )
+
+    def assert_same_bytes(self, model_data, lean_data):
+        self.assertEqual(
+            JSONRenderer().render(model_data), FastJSONRenderer().render(lean_data)
+        )
+
+    def test_projects(self):
+        queryset = Project.objects.order_by("id")
+        serializer = LeanProjectSerializer()
+
+        self.assert_same_bytes(
+            ProjectModelSerializer(queryset.with_related(), many=True).data,
+            serializer.to_representation_many(serializer.get_rows(queryset)),
+        )
+
+        with timezone.override("America/New_York"):
+            self.assert_same_bytes(
+                ProjectModelSerializer(queryset.with_related(), many=True).data,
+                serializer.to_representation_many(serializer.get_rows(queryset)),
+            )
+
+        self.assertNotIn("deleted_at", ProjectModelSerializer(queryset[0]).data)
+
+    def test_tasks(self):
+        queryset = ProjectTask.objects.order_by("id")
+        serializer = LeanTaskSerializer()
+
+        self.assert_same_bytes(
+            TaskModelSerializer(queryset.with_related(), many=True).data,
+            serializer.to_representation_many(serializer.get_rows(queryset)),
+        )
+
+    def test_renderer(self):
+        data = {
+            "datetime": timezone.now(),
+            "date": timezone.now().date(),
+            "decimal": Decimal("1.10"),
+            "uuid": uuid.uuid4(),
+            "float": 0.3333,
+            "none": None,
+            "errors": {"name": [ErrorDetail("Required.", code="required")]},
+            1: "integer key",
+        }
+
+        self.assertEqual(JSONRenderer().render(data), FastJSONRenderer().render(data))
+        # too large for orjson
+        self.assertEqual(
+            JSONRenderer().render({"big": 2**70}),
+            FastJSONRenderer().render({"big": 2**70}),
+        )
+        self.assertEqual(
+            JSONRenderer().render(data, "application/json; indent=4"),
+            FastJSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+
+@override_settings(LIST_CACHE_TIMEOUT=0)
+class SparseFieldsetTestCase(APITestCase):
+    """
+    fields= / expand= PICK THE KEYS OF THE LIST ITEMS AND THE COLUMNS READ
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", email="testuser@example.com", password="testuser"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.create(user=self.user, name="project", description="d")
+        for index in range(2):
+            ProjectTask.create(
+                project=self.project,
+                title=f"task {index}",
+                description="description",
+                due_date=timezone.now(),
+                priority_level="LOW",
+            )
+
+    def get_items(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]["data"]
+
+    def test_task_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            items = self.get_items("/api/task/?fields=id,title,status,due_date,project")
+
+        self.assertEqual(
+            list(items[0]), ["id", "due_date", "title", "status", "project"]
+        )
+        self.assertEqual(items[0]["project"], self.project.id)
+
+        page_sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn('"main_task"."description"', page_sql)
+        self.assertNotIn('"main_project"."description"', page_sql)
+
+    def test_task_expand(self):
+        items = self.get_items("/api/task/?fields=id,project&expand=project")
+        self.assertEqual(items[0]["project"]["name"], "project")
+        self.assertEqual(items[0]["project"]["user"], self.user.id)
+
+        items = self.get_items("/api/task/?expand=project.user")
+        self.assertIn("description", items[0])
+        self.assertEqual(items[0]["project"]["user"]["username"], "testuser")
+
+    def test_project_fields(self):
+        items = self.get_items("/api/project/?fields=id,name,task_count,user")
+
+        self.assertEqual(
+            items,
+            [
+                {
+                    "id": self.project.id,
+                    "name": "project",
+                    "task_count": 2,
+                    "user": self.user.id,
+                }
+            ],
+        )
+
+    def test_cursor_without_id(self):
+        url = "/api/task/?pagination=cursor&page_size=1&fields=title"
+        first = self.client.get(url).data
+        second = self.client.get(first["next"]).data
+
+        self.assertEqual(first["results"]["data"], [{"title": "task 0"}])
+        self.assertEqual(second["results"]["data"], [{"title": "task 1"}])
+
+    def test_invalid_options(self):
+        response = self.client.get("/api/task/?fields=id,secret")
+        self.assertEqual(response.data["message"], "Invalid fields option")
+
+        response = self.client.get("/api/project/?expand=project")
+        self.assertEqual(response.data["message"], "Invalid expand option")
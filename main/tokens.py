@@ -0,0 +1,12 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+
+def issue_tokens(user):
+    """
+    THIS METHOD ISSUES A REFRESH / ACCESS TOKEN PAIR FOR A USER
+    the refresh token is minted once and the access token is derived from it,
+    so both share the same claims and only the two signatures are computed
+    """
+    refresh = TokenObtainPairSerializer.get_token(user)
+
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
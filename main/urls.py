@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
+from main.async_views import AsyncProjectApiView, AsyncProjectTaskApiView
 from main.views import (
     CreateAccountApiView,
+    ExportApiView,
+    ImportApiView,
+    JobApiView,
     LoginApiView,
     ProjectApiView,
     ProjectTaskApiView,
+    ProjectTaskBulkApiView,
+    TaskStatsApiView,
 )
 
 ACCOUNT_URLS = [
@@ -16,8 +23,18 @@ ACCOUNT_URLS = [
     path("account/login/", LoginApiView.as_view(), name="login"),
 ]
 
+if settings.ASYNC_API_VIEWS:
+    ProjectView, TaskView = AsyncProjectApiView, AsyncProjectTaskApiView
+else:
+    ProjectView, TaskView = ProjectApiView, ProjectTaskApiView
+
 urlpatterns = [
-    path("project/", ProjectApiView.as_view(), name="project"),
-    path("task/", ProjectTaskApiView.as_view(), name="task"),
+    path("project/", ProjectView.as_view(), name="project"),
+    path("task/", TaskView.as_view(), name="task"),
+    path("task/bulk/", ProjectTaskBulkApiView.as_view(), name="task-bulk"),
+    path("task/stats/", TaskStatsApiView.as_view(), name="task-stats"),
+    path("export/", ExportApiView.as_view(), name="export"),
+    path("import/", ImportApiView.as_view(), name="import"),
+    path("job/", JobApiView.as_view(), name="job"),
     *ACCOUNT_URLS,
 ]
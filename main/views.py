@@ -1,7 +1,12 @@
-from datetime import datetime
+import csv
+import io
 
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from drf_yasg import openapi
@@ -9,24 +14,44 @@ from drf_yasg.utils import swagger_auto_schema
 from requests import delete
 from rest_framework import exceptions, status
 from rest_framework.decorators import authentication_classes
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
-
-from main.models import Project
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from main.cache import bump_list_version, cache_list_response
+from main.conditional import get_not_modified_response
+from main.export import EXPORT_FORMATS, stream_export
+from main.filters import ProjectFilter, TaskFilter
+from main.importer import IMPORT_FORMATS, Importer, check_encoding
+from main.lists import (
+    PROJECT_UPDATED_FIELDS,
+    TASK_UPDATED_FIELDS,
+    get_invalid_cursor_response,
+    get_list_etag,
+    get_list_paginator,
+    get_list_response,
+    get_list_rows,
+    parse_list_request,
+)
+from main.models import Job, Project
 from main.models import Task as ProjectTask
+from main.pagination import InvalidCursor
+from main.purge import delete_project
 from main.serializer import (
     CreateAccountSerializer,
+    JobModelSerializer,
+    LeanProjectSerializer,
+    LeanTaskSerializer,
     LoginSerializer,
     ProjectModelSerializer,
     ProjectSerializer,
+    TaskBulkSerializer,
     TaskModelSerializer,
     TaskSerializer,
 )
+from main.tokens import issue_tokens
 
 # error_codes = {
 #     "40001": "User not found",
@@ -121,30 +146,28 @@ class CreateAccountApiView(APIView):
         # get_user_model returns the user model that is active in this project
         User = get_user_model()
 
-        # check if user email or username already exists
-        if User.objects.filter(email=email).exists():
-            raise exceptions.ValidationError({"email": "Email already exists"})
-        elif User.objects.filter(username=username).exists():
+        # create user, the unique indexes on email and username reject duplicates
+        # in the same statement, so concurrent signups cannot both succeed
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=username, password=make_password(password), email=email
+                )
+        except IntegrityError:
+            # only the failed signup pays for finding out which value is taken
+            if User.objects.filter(email=email).exists():
+                raise exceptions.ValidationError({"email": "Email already exists"})
             raise exceptions.ValidationError({"username": "Username already exists"})
-        else:
-            # create user
-            user = User.objects.create(
-                username=username, password=make_password(password), email=email
-            )
-            user.save()
 
-            # generate tokens for user
-            tokenr = TokenObtainPairSerializer().get_token(user)
-            tokena = AccessToken().for_user(user)
-
-            data = {
-                "error": False,
-                "code": "201",
-            }
+        data = {
+            "error": False,
+            "code": "201",
+        }
 
-            data["tokens"] = {"refresh": str(tokenr), "access": str(tokena)}
+        # generate tokens for user
+        data["tokens"] = issue_tokens(user)
 
-            return Response(data, status=status.HTTP_201_CREATED)
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
 class LoginApiView(APIView):
@@ -225,15 +248,12 @@ class LoginApiView(APIView):
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        tokenr = TokenObtainPairSerializer().get_token(user)
-        tokena = AccessToken().for_user(user)
-
         data = {
             "error": False,
             "code": "200",
         }
 
-        data["tokens"] = {"refresh": str(tokenr), "access": str(tokena)}
+        data["tokens"] = issue_tokens(user)
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -242,7 +262,7 @@ class ProjectApiView(APIView):
     """
     PROJECT API VIEW
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = (IsAuthenticated,)
 
     serializer_class = ProjectSerializer
@@ -254,7 +274,8 @@ class ProjectApiView(APIView):
 
         # create project payload
         create_project_payload = {
-            "user": request.user,
+            # the token user has no row, load it through the in-process cache
+            "user": request.user.get_user(),
             "name": serializer.validated_data.get("name"),
             "description": serializer.validated_data.get("description"),
         }
@@ -269,89 +290,34 @@ class ProjectApiView(APIView):
 
         return Response(data, status=status.HTTP_201_CREATED)
 
+    @cache_list_response("project")
     def get(self, request):
-        sort_by = request.GET.get("sort_by")
-        search = request.GET.get("search")
-        created_date_from = request.GET.get("created_date_from")
-        created_date_to = request.GET.get("created_date_to")
-
-        sort_options = ["asc", "desc"]
-
-        if sort_by and sort_by not in sort_options:
-            data = {
-                "error": True,
-                "code": "40007",
-                "message": "Invalid sort option",
-            }
-
-            return Response(data, status=status.HTTP_400_BAD_REQUEST)
-
-        if created_date_from and not created_date_to:
-            data = {
-                "error": True,
-                "code": "40007",
-                "message": "End date is required",
-            }
-
-            return Response(data, status=status.HTTP_400_BAD_REQUEST)
-
-        if created_date_to and not created_date_from:
-            data = {
-                "error": True,
-                "code": "40007",
-                "message": "Start date is required",
-            }
-
-            return Response(data, status=status.HTTP_400_BAD_REQUEST)
-
-        if created_date_from and created_date_to:
-            # formate date
-            try:
-                if created_date_from:
-                    datetime.strptime(created_date_from, "%Y-%m-%d")
-                if created_date_to:
-                    datetime.strptime(created_date_to, "%Y-%m-%d")
-            except:
-                data = {
-                    "error": True,
-                    "code": "40007",
-                    "message": "Invalid date format. Date format should be YYYY-MM-DD",
-                }
-
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
-
-        if created_date_from and created_date_to:
-            project_qs = Project.filter_by_created_date(
-                start_date=created_date_from,
-                end_date=created_date_to,
-                user_id=request.user.id,
-            )
-        elif search:
-            project_qs = Project.search_project(
-                search_term=search, user_id=request.user.id
-            )
+        list_filter, lean_serializer, error_response = parse_list_request(
+            request, ProjectFilter, LeanProjectSerializer
+        )
+        if error_response is not None:
+            return error_response
 
-        else:
-            project_qs = Project.objects.filter(user__id=request.user.id)
+        project_qs = list_filter.qs
 
-        if sort_by:
-            project_qs = Project.sort_data(queryset=project_qs, sort_by=sort_by)
+        # answer If-None-Match before serializing anything
+        etag = get_list_etag(
+            request, project_qs, updated_fields=PROJECT_UPDATED_FIELDS
+        )
 
-        paginator = PageNumberPagination()
-        paginator.page_size = 10
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
 
-        result_page = paginator.paginate_queryset(project_qs, request)
+        rows = get_list_rows(request, Project, project_qs, lean_serializer)
 
-        serialized_data = ProjectModelSerializer(result_page, many=True).data
-
-        data = {
-            "error": False,
-            "code": "200",
-            "message": "data fetched successfully",
-            "data": serialized_data,
-        }
+        paginator = get_list_paginator(request)
+        try:
+            result_page = paginator.paginate_queryset(rows, request)
+        except InvalidCursor:
+            return get_invalid_cursor_response()
 
-        return paginator.get_paginated_response(data)
+        return get_list_response(paginator, lean_serializer, result_page, etag)
 
     def put(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -360,7 +326,7 @@ class ProjectApiView(APIView):
         project_id = request.GET.get("project_id")
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.not_deleted().get(id=project_id)
         except Project.DoesNotExist:
             data = {
                 "error": True,
@@ -372,7 +338,7 @@ class ProjectApiView(APIView):
 
         project.name = serializer.validated_data.get("name")
         project.description = serializer.validated_data.get("description")
-        project.save()
+        project.save(update_fields=["name", "description", "updated_at"])
 
         data = {
             "error": False,
@@ -387,7 +353,7 @@ class ProjectApiView(APIView):
         project_id = request.GET.get("project_id")
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.not_deleted().get(id=project_id)
         except Project.DoesNotExist:
             data = {
                 "error": True,
@@ -404,7 +370,7 @@ class ProjectApiView(APIView):
         project.name = name
         project.description = description
         project.is_active = is_active
-        project.save()
+        project.save(update_fields=["name", "description", "is_active", "updated_at"])
 
         data = {
             "error": False,
@@ -419,7 +385,7 @@ class ProjectApiView(APIView):
         project_id = request.GET.get("project_id")
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.not_deleted().get(id=project_id)
         except Project.DoesNotExist:
             data = {
                 "error": True,
@@ -429,19 +395,21 @@ class ProjectApiView(APIView):
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        project.delete()
+        # the tasks are purged in batches by a job, see main/purge.py
+        job = delete_project(project)
 
         data = {
             "error": False,
             "code": "200",
             "message": "Project deleted successfully",
+            "job_id": job.id,
         }
 
         return Response(data, status=status.HTTP_200_OK)
 
 
 class ProjectTaskApiView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = (IsAuthenticated,)
 
     serializer_class = TaskSerializer
@@ -452,7 +420,7 @@ class ProjectTaskApiView(APIView):
 
         project_id = serializer.validated_data.get("project_id")
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.not_deleted().get(id=project_id)
         except Project.DoesNotExist:
             data = {
                 "error": True,
@@ -481,234 +449,486 @@ class ProjectTaskApiView(APIView):
 
         return Response(data, status=status.HTTP_201_CREATED)
 
+    @cache_list_response("task")
     def get(self, request):
-        sort_by = request.GET.get("sort_by")
-        search = request.GET.get("search")
-        created_date_from = request.GET.get("created_date_from")
-        created_date_to = request.GET.get("created_date_to")
-        due_date_from = request.GET.get("due_date_from")
-        due_date_to = request.GET.get("due_date_to")
+        list_filter, lean_serializer, error_response = parse_list_request(
+            request, TaskFilter, LeanTaskSerializer
+        )
+        if error_response is not None:
+            return error_response
+
+        task_qs = list_filter.qs
+
+        # answer If-None-Match before serializing anything
+        etag = get_list_etag(
+            request, task_qs, updated_fields=TASK_UPDATED_FIELDS
+        )
+
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
 
-        sort_options = ["asc", "desc"]
+        rows = get_list_rows(request, ProjectTask, task_qs, lean_serializer)
 
-        if sort_by and sort_by not in sort_options:
+        paginator = get_list_paginator(request)
+        try:
+            result_page = paginator.paginate_queryset(rows, request)
+        except InvalidCursor:
+            return get_invalid_cursor_response()
+
+        return get_list_response(paginator, lean_serializer, result_page, etag)
+
+    def put(self, request):
+        task_id = request.GET.get("task_id")
+
+        try:
+            task = ProjectTask.objects.not_deleted().with_related().get(id=task_id)
+        except ProjectTask.DoesNotExist:
             data = {
                 "error": True,
-                "code": "40007",
-                "message": "Invalid sort option",
+                "code": "40004",
+                "message": "Task not found",
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        if created_date_from and not created_date_to:
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        update_payload = {
+            "title": serializer.validated_data.get("title"),
+            "description": serializer.validated_data.get("description"),
+            "due_date": serializer.validated_data.get("due_date"),
+            "priority_level": serializer.validated_data.get("priority_level"),
+            "status": serializer.validated_data.get("status"),
+        }
+
+        task.save_changes(**update_payload)
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Task updated successfully",
+            "task": TaskModelSerializer(task).data,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def patch(self, request):
+        task_id = request.GET.get("task_id")
+
+        try:
+            task = ProjectTask.objects.not_deleted().with_related().get(id=task_id)
+        except ProjectTask.DoesNotExist:
             data = {
                 "error": True,
-                "code": "40007",
-                "message": "End date is required",
+                "code": "40004",
+                "message": "Task not found",
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        if created_date_to and not created_date_from:
+        # only the fields sent are written, so a PATCH that leaves project and
+        # status alone never touches the project counters
+        update_payload = {
+            field: request.data[field]
+            for field in ProjectTask.EDITABLE_FIELDS
+            if field in request.data
+        }
+
+        try:
+            task.save_changes(**update_payload)
+        except DjangoValidationError as e:
             data = {
                 "error": True,
-                "code": "40007",
-                "message": "Start date is required",
+                "code": "40005",
+                "message": "Validation failed",
+                "errors": e.messages,
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        if due_date_from and not due_date_to:
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Task updated successfully",
+            "task": TaskModelSerializer(task).data,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        task_id = request.GET.get("task_id")
+
+        try:
+            task = ProjectTask.objects.not_deleted().with_related().get(id=task_id)
+        except ProjectTask.DoesNotExist:
             data = {
                 "error": True,
-                "code": "40007",
-                "message": "End date is required",
+                "code": "40004",
+                "message": "Task not found",
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        if due_date_to and not due_date_from:
+        task.delete()
+        bump_list_version(task.project.user_id)
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "Task deleted successfully",
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ProjectTaskBulkApiView(APIView):
+    """
+    BULK TASK API VIEW
+    creates, updates and deletes many tasks in one request and one transaction;
+    an update whose project_id differs moves the task to that project
+
+    BODY PARAMS:
+    {
+        "create": [{"project_id": 1, "title": "", "description": "", "due_date": "2023-10-01", "priority_level": "", "status": "TO_DO"}],
+        "update": [{"id": 1, "project_id": 1, "title": "", "description": "", "due_date": "2023-10-01", "priority_level": "", "status": "TO_DO"}],
+        "delete": [1, 2, 3]
+    }
+    """
+
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = (IsAuthenticated,)
+
+    serializer_class = TaskBulkSerializer
+
+    update_fields = ["title", "description", "due_date", "priority_level", "status"]
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+
+        if not serializer.is_valid():
             data = {
                 "error": True,
-                "code": "40007",
-                "message": "Start date is required",
+                "code": "40005",
+                "message": "Validation failed",
+                "errors": serializer.errors,
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        if due_date_from and due_date_to:
-            # formate date
-            try:
-                if due_date_from:
-                    datetime.strptime(due_date_from, "%Y-%m-%d")
-                if due_date_to:
-                    datetime.strptime(due_date_to, "%Y-%m-%d")
-            except:
-                data = {
-                    "error": True,
-                    "code": "40007",
-                    "message": "Invalid date format. Date format should be YYYY-MM-DD",
-                }
-
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
-
-        if created_date_from and created_date_to:
-            # formate date
-            try:
-                if created_date_from:
-                    datetime.strptime(created_date_from, "%Y-%m-%d")
-                if created_date_to:
-                    datetime.strptime(created_date_to, "%Y-%m-%d")
-            except:
-                data = {
-                    "error": True,
-                    "code": "40007",
-                    "message": "Invalid date format. Date format should be YYYY-MM-DD",
-                }
-
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
-
-        project_ids = request.user.projects.values_list("id", flat=True)
-
-        if created_date_from and created_date_to:
-            task_qs = ProjectTask.filter_by_created_date(
-                start_date=created_date_from,
-                end_date=created_date_to,
-                project_ids=project_ids,
-            )
-
-        elif due_date_from and due_date_to:
-            task_qs = ProjectTask.filter_by_due_date(
-                start_date=due_date_from,
-                end_date=due_date_to,
-                project_ids=project_ids,
-            )
-
-        elif search:
-            task_qs = ProjectTask.search_task(
-                search_term=search, project_ids=project_ids
-            )
-
-        else:
-            task_qs = ProjectTask.objects.filter(project__id__in=project_ids)
+        create_items = serializer.validated_data.get("create", [])
+        update_items = serializer.validated_data.get("update", [])
+        delete_ids = serializer.validated_data.get("delete", [])
+
+        # one query each for every project and task referenced by the batch
+        projects = Project.objects.for_user(request.user.id).in_bulk(
+            {item["project_id"] for item in create_items + update_items}
+        )
+        tasks = ProjectTask.objects.for_user(request.user.id).in_bulk(
+            {item["id"] for item in update_items} | set(delete_ids)
+        )
+
+        errors = {
+            "create": [
+                {"index": index, "project_id": ["Project not found"]}
+                for index, item in enumerate(create_items)
+                if item["project_id"] not in projects
+            ],
+            "update": [
+                error
+                for index, item in enumerate(update_items)
+                if (error := self.get_update_error(index, item, tasks, projects))
+            ],
+            "delete": [
+                {"index": index, "id": ["Task not found"]}
+                for index, task_id in enumerate(delete_ids)
+                if task_id not in tasks
+            ],
+        }
 
-        if sort_by:
-            task_qs = ProjectTask.sort_data(queryset=task_qs, sort_by=sort_by)
+        if any(errors.values()):
+            data = {
+                "error": True,
+                "code": "40004",
+                "message": "Resource not found",
+                "errors": {key: value for key, value in errors.items() if value},
+            }
 
-        paginator = PageNumberPagination()
-        paginator.page_size = 10
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        result_page = paginator.paginate_queryset(task_qs, request)
+        new_tasks = [
+            ProjectTask(
+                project=projects[item["project_id"]],
+                title=item.get("title"),
+                description=item.get("description"),
+                due_date=item.get("due_date"),
+                priority_level=item.get("priority_level"),
+                status=item.get("status"),
+            )
+            for item in create_items
+        ]
+
+        updated_tasks = []
+        for item in update_items:
+            task = tasks[item["id"]]
+            task.project = projects[item["project_id"]]
+            for field in self.update_fields:
+                setattr(task, field, item.get(field))
+
+            updated_tasks.append(task)
+
+        with transaction.atomic():
+            ProjectTask.create_many(new_tasks)
+            # update_many moves the counters of tasks changing project
+            ProjectTask.update_many(
+                updated_tasks, fields=["project", *self.update_fields]
+            )
+            ProjectTask.objects.filter(id__in=delete_ids).delete()
 
-        serialized_data = TaskModelSerializer(result_page, many=True).data
+            # bulk_create / bulk_update / queryset delete send no signals
+            bump_list_version(request.user.id)
 
         data = {
             "error": False,
             "code": "200",
-            "message": "data fetched successfully",
-            "data": serialized_data,
+            "message": "Tasks processed successfully",
+            "created": [
+                {"index": index, "id": task.id} for index, task in enumerate(new_tasks)
+            ],
+            "updated": [
+                {"index": index, "id": task.id}
+                for index, task in enumerate(updated_tasks)
+            ],
+            "deleted": [
+                {"index": index, "id": task_id}
+                for index, task_id in enumerate(delete_ids)
+            ],
         }
 
-        return paginator.get_paginated_response(data)
+        return Response(data, status=status.HTTP_200_OK)
 
-    def put(self, request):
-        task_id = request.GET.get("task_id")
+    @staticmethod
+    def get_update_error(index, item, tasks, projects):
+        error = {}
+        if item["id"] not in tasks:
+            error["id"] = ["Task not found"]
+        if item["project_id"] not in projects:
+            error["project_id"] = ["Project not found"]
 
-        try:
-            task = ProjectTask.objects.get(id=task_id)
-        except ProjectTask.DoesNotExist:
+        return {"index": index, **error} if error else None
+
+
+class ExportApiView(APIView):
+    """
+    EXPORT API VIEW
+    streams all of the user's projects and tasks
+
+    QUERY PARAMS:
+        export_format: ndjson (default) or csv
+    """
+
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        export_format = request.GET.get("export_format", "ndjson")
+
+        if export_format not in EXPORT_FORMATS:
             data = {
                 "error": True,
-                "code": "40004",
-                "message": "Task not found",
+                "code": "40007",
+                "message": "Invalid export format",
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = self.serializer_class(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        chunks, content_type = stream_export(request.user.id, export_format)
 
-        update_payload = {
-            "title": serializer.validated_data.get("title"),
-            "description": serializer.validated_data.get("description"),
-            "due_date": serializer.validated_data.get("due_date"),
-            "priority_level": serializer.validated_data.get("priority_level"),
-            "status": serializer.validated_data.get("status"),
-        }
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="tasks-export.{export_format}"'
+        )
 
-        ProjectTask.update(task_id=task_id, **update_payload)
+        return response
 
-        task = ProjectTask.objects.get(id=task_id)
 
-        data = {
-            "error": False,
-            "code": "200",
-            "message": "Task updated successfully",
-            "task": TaskModelSerializer(task).data,
-        }
+class ImportApiView(APIView):
+    """
+    IMPORT API VIEW
+    creates projects and tasks from an uploaded NDJSON or CSV file, in the
+    export's format. Very large files are better imported with
+    `python manage.py import_tasks`.
+
+    FORM DATA:
+        file: the NDJSON / CSV file
+        import_format: ndjson (default) or csv
+    """
 
-        return Response(data, status=status.HTTP_200_OK)
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = (IsAuthenticated,)
+    parser_classes = [MultiPartParser]
 
-    def patch(self, request):
-        task_id = request.GET.get("task_id")
+    def post(self, request):
+        upload = request.FILES.get("file")
+        import_format = request.data.get("import_format", "ndjson")
+
+        if upload is None:
+            data = {
+                "error": True,
+                "code": "40005",
+                "message": "No file uploaded",
+            }
+
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        if import_format not in IMPORT_FORMATS:
+            data = {
+                "error": True,
+                "code": "40007",
+                "message": "Invalid import format",
+            }
 
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        # decode the whole file before inserting anything
         try:
-            task = ProjectTask.objects.get(id=task_id)
-        except ProjectTask.DoesNotExist:
+            check_encoding(upload.chunks())
+        except UnicodeDecodeError:
             data = {
                 "error": True,
-                "code": "40004",
-                "message": "Task not found",
+                "code": "40005",
+                "message": "File is not UTF-8 encoded",
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        title = request.data.get("title", task.title)
-        description = request.data.get("description", task.description)
-        due_date = request.data.get("due_date", task.due_date)
-        priority_level = request.data.get("priority_level", task.priority_level)
-        _status = request.data.get("status", task.status)
+        # read the upload as text line by line, large uploads stay on disk
+        upload.seek(0)
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        records = IMPORT_FORMATS[import_format](lines)
 
-        update_payload = {
-            "title": title,
-            "description": description,
-            "due_date": due_date,
-            "priority_level": priority_level,
-            "status": _status,
+        importer = Importer(request.user.id)
+        try:
+            importer.run(records)
+        except csv.Error as e:
+            # the batches before the broken row are imported, say how many
+            data = {
+                "error": True,
+                "code": "40005",
+                "message": f"Invalid CSV: {e}",
+                **importer.get_report(),
+            }
+
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            "error": False,
+            "code": "200",
+            "message": "File imported",
+            **importer.get_report(),
         }
 
-        ProjectTask.update(task_id=task_id, **update_payload)
-        task = ProjectTask.objects.get(id=task_id)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class TaskStatsApiView(APIView):
+    """
+    TASK STATISTICS API VIEW
+    task counts by status, overdue and due this week, per project and overall,
+    computed by the database in one grouped query
+    """
+
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = (IsAuthenticated,)
+
+    count_fields = [
+        "total",
+        *(f"status_{option.lower()}" for option, _ in ProjectTask.STATUS_OPTIONS),
+        "overdue",
+        "due_this_week",
+    ]
+
+    @cache_list_response("task-stats")
+    def get(self, request):
+        rows = list(
+            Project.objects.for_user(request.user.id)
+            .with_task_stats(timezone.now())
+            .order_by("id")
+            .values("id", "name", *self.count_fields)
+        )
+
+        projects = [
+            {"project_id": row["id"], "name": row["name"], **self.format_counts(row)}
+            for row in rows
+        ]
+
+        # the overall numbers are the sum of the per-project ones
+        overall = {
+            field: sum(row[field] for row in rows) for field in self.count_fields
+        }
 
         data = {
             "error": False,
             "code": "200",
-            "message": "Task updated successfully",
-            "task": TaskModelSerializer(task).data,
+            "message": "data fetched successfully",
+            "data": {
+                "overall": self.format_counts(overall),
+                "projects": projects,
+            },
         }
 
         return Response(data, status=status.HTTP_200_OK)
 
-    def delete(self, request):
-        task_id = request.GET.get("task_id")
+    @staticmethod
+    def format_counts(counts):
+        total = counts["total"]
+        completed = counts["status_completed"]
+
+        return {
+            "total": total,
+            "by_status": {
+                option: counts[f"status_{option.lower()}"]
+                for option, _ in ProjectTask.STATUS_OPTIONS
+            },
+            "overdue": counts["overdue"],
+            "due_this_week": counts["due_this_week"],
+            "completion_rate": round(completed / total, 4) if total else 0.0,
+        }
+
+
+class JobApiView(APIView):
+    """
+    JOB API VIEW
+    polls a background job the user started, e.g. the purge returned as
+    job_id by DELETE /api/project/
+
+    QUERY PARAMS:
+        job_id: the job
+    """
+
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        job_id = request.GET.get("job_id")
 
         try:
-            task = ProjectTask.objects.get(id=task_id)
-        except ProjectTask.DoesNotExist:
+            job = Job.objects.get(id=job_id, user_id=request.user.id)
+        except (Job.DoesNotExist, ValueError):
             data = {
                 "error": True,
                 "code": "40004",
-                "message": "Task not found",
+                "message": "Job not found",
             }
 
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        task.delete()
-
         data = {
             "error": False,
             "code": "200",
-            "message": "Task deleted successfully",
+            "message": "data fetched successfully",
+            "job": JobModelSerializer(job).data,
         }
 
         return Response(data, status=status.HTTP_200_OK)